@@ -0,0 +1 @@
+# Subpackage initialization for analytics
\ No newline at end of file
@@ -0,0 +1,110 @@
+import numpy as np
+from ..database.db_manager import STATUS_PRESENT
+
+# Cell values of an attendance matrix; MISSING means the student has no record for that session
+MISSING = -1
+
+
+class LessonMatrix:
+    def __init__(self, lesson, session_ids, student_refs, matrix):
+        self.lesson = lesson
+        self.session_ids = session_ids
+        self.student_refs = student_refs
+        # students x sessions, int8, sessions in date order
+        self.matrix = matrix
+
+    def present_counts(self):
+        return (self.matrix == STATUS_PRESENT).sum(axis=1)
+
+    def recorded_counts(self):
+        return (self.matrix != MISSING).sum(axis=1)
+
+    def attendance_rates(self):
+        recorded = self.recorded_counts()
+        return np.divide(self.present_counts(), recorded, out=np.zeros(len(recorded)), where=recorded > 0)
+
+    def absence_streaks(self):
+        # (longest, current) runs of consecutive absences per student; a missing record ends a run
+        absent = (self.matrix != STATUS_PRESENT) & (self.matrix != MISSING)
+        students, sessions = absent.shape
+        edges = np.diff(np.pad(absent, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+        start_rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        longest = np.zeros(students, dtype=np.int64)
+        np.maximum.at(longest, start_rows, ends - starts)
+        not_absent = ~absent[:, ::-1]
+        current = np.where(not_absent.any(axis=1), not_absent.argmax(axis=1), sessions)
+        return longest, current
+
+
+class AttendanceAnalytics:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.student_ids = {}
+        self.matrices = []
+
+    def load(self, lesson_name=None):
+        sessions, cells, lesson_names, self.student_ids = self.db_manager.fetch_attendance_data(lesson_name)
+        self.matrices = self.build_matrices(np.array(sessions, dtype=np.int64).reshape(-1, 2),
+                                            np.array(cells, dtype=np.int64).reshape(-1, 3), lesson_names)
+        return self.matrices
+
+    def build_matrices(self, sessions, cells, lesson_names):
+        if not len(sessions):
+            return []
+        session_ids, session_lessons = sessions[:, 0], sessions[:, 1]
+        # Sessions arrive grouped by lesson in date order, so a column is the offset within its group
+        lessons, group_starts = np.unique(session_lessons, return_index=True)
+        size = session_ids.max() + 1
+        lesson_of = np.full(size, -1, dtype=np.int64)
+        column_of = np.full(size, -1, dtype=np.int64)
+        lesson_of[session_ids] = np.searchsorted(lessons, session_lessons)
+        column_of[session_ids] = np.arange(len(session_ids)) - group_starts[lesson_of[session_ids]]
+
+        cell_lessons = lesson_of[cells[:, 0]]
+        order = np.argsort(cell_lessons, kind="stable")
+        cells, cell_lessons = cells[order], cell_lessons[order]
+        bounds = np.searchsorted(cell_lessons, np.arange(len(lessons) + 1))
+        group_ends = np.append(group_starts[1:], len(session_ids))
+
+        matrices = []
+        for index, lesson_id in enumerate(lessons):
+            lesson_cells = cells[bounds[index]:bounds[index + 1]]
+            student_refs, rows = np.unique(lesson_cells[:, 1], return_inverse=True)
+            matrix = np.full((len(student_refs), group_ends[index] - group_starts[index]), MISSING, dtype=np.int8)
+            matrix[rows, column_of[lesson_cells[:, 0]]] = lesson_cells[:, 2]
+            matrices.append(LessonMatrix(lesson_names.get(int(lesson_id), ""),
+                                         session_ids[group_starts[index]:group_ends[index]], student_refs, matrix))
+        return matrices
+
+    def ranks(self, rates):
+        # Competition ranking (1, 1, 3): ties share a rank, best attendance is 1
+        return np.searchsorted(np.sort(-rates), -rates, side="left") + 1
+
+    def lesson_report(self, min_rate=2 / 3, streak_alert=3):
+        # Rows of (student_id, lesson, sessions, present, rate, longest streak, current streak, rank, alert)
+        report = []
+        for lesson_matrix in self.matrices:
+            rates = lesson_matrix.attendance_rates()
+            longest, current = lesson_matrix.absence_streaks()
+            alerts = (rates < min_rate) | (current >= streak_alert)
+            columns = (lesson_matrix.recorded_counts(), lesson_matrix.present_counts(), rates, longest, current,
+                       self.ranks(rates), alerts)
+            for student_ref, *values in zip(lesson_matrix.student_refs.tolist(), *(c.tolist() for c in columns)):
+                report.append((self.student_ids.get(student_ref, ""), lesson_matrix.lesson, *values))
+        return report
+
+    def student_report(self, min_rate=2 / 3):
+        # Rows of (student_id, sessions, present, rate, rank, alert) across all lessons, best first
+        if not self.matrices:
+            return []
+        refs = np.concatenate([m.student_refs for m in self.matrices])
+        students, index = np.unique(refs, return_inverse=True)
+        present = np.bincount(index, np.concatenate([m.present_counts() for m in self.matrices]))
+        recorded = np.bincount(index, np.concatenate([m.recorded_counts() for m in self.matrices]))
+        rates = np.divide(present, recorded, out=np.zeros(len(recorded)), where=recorded > 0)
+        ranks = self.ranks(rates)
+        order = np.argsort(ranks, kind="stable")
+        return [(self.student_ids.get(student_ref, ""), int(recorded[i]), int(present[i]), float(rates[i]),
+                 int(ranks[i]), bool(rates[i] < min_rate))
+                for i, student_ref in zip(order.tolist(), students[order].tolist())]
\ No newline at end of file
@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from .config.config_manager import ConfigManager
+from .database.db_manager import DatabaseManager, DatabaseError, raise_database_error, CONFLICT_MODES, RECORD_STATUSES
+from .utils.instrumentation import INSTRUMENTATION
+
+# Exit codes; argparse exits with 2 on usage errors
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_BAD_INPUT = 3
+EXIT_INCONSISTENT = 4
+
+IMPORT_TYPES = {"lesson": "import_lesson_info", "student": "import_student_info", "presence": "import_presence_info"}
+
+
+class CommandError(Exception):
+    def __init__(self, message, exit_code=EXIT_FAILED):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+def print_warning(title, message):
+    print(f"{title}: {message}", file=sys.stderr)
+
+
+def progress_printer(enabled):
+    if not enabled:
+        return None
+    return lambda rows: print(f"{rows} rows processed", file=sys.stderr, flush=True)
+
+
+def require_file(file_path):
+    if not os.path.isfile(file_path):
+        raise CommandError(f"File not found: {file_path}", EXIT_BAD_INPUT)
+
+
+def record_filters(args):
+    # Only the filters given on the command line, as DatabaseManager.record_filter keywords
+    filters = {"lesson_name": args.lesson, "student_id": args.student, "status": args.status,
+               "start_date": args.start_date, "end_date": args.end_date}
+    return {key: value for key, value in filters.items() if value}
+
+
+def add_record_filter_arguments(parser):
+    parser.add_argument("--lesson")
+    parser.add_argument("--student", help="student ID")
+    parser.add_argument("--status", choices=RECORD_STATUSES)
+    parser.add_argument("--from", dest="start_date", help="first date, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="last date, inclusive (YYYY-MM-DD)")
+
+
+def run_import(db_manager, config_manager, args):
+    require_file(args.file)
+    extension = os.path.splitext(args.file)[1].lower()
+    if extension == ".db":
+        method = getattr(db_manager, IMPORT_TYPES[args.type])
+        try:
+            if args.type == "student":
+                success = method(args.file, True, [], args.progress)
+            elif args.type == "presence":
+                success = method(args.file, True, args.progress, args.conflict)
+            else:
+                success = method(args.file, True, args.progress)
+        except ValueError as e:
+            raise CommandError(str(e), EXIT_BAD_INPUT)
+        if not success:
+            raise CommandError(f"Failed to import {args.type} info from {args.file}")
+    elif extension in (".csv", ".xlsx"):
+        # Streaming keeps memory flat and lets a rerun of a failed nightly job resume
+        batch_size = args.batch_size or config_manager.get_import_batch_size()
+        try:
+            db_manager.import_file_streaming(args.file, args.type, batch_size, not args.restart, args.progress,
+                                             args.conflict)
+        except ValueError as e:
+            raise CommandError(str(e), EXIT_BAD_INPUT)
+    else:
+        raise CommandError(f"Unsupported import file: {extension or 'no extension'}", EXIT_BAD_INPUT)
+    return {"import_type": args.type, "file": args.file, **db_manager.last_import_stats}
+
+
+def run_export(db_manager, config_manager, args):
+    from .database.export_manager import ExportManager
+
+    exporter = ExportManager(db_manager)
+    try:
+        exporter.detect_format(args.file)
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_BAD_INPUT)
+    filters = record_filters(args)
+    started = time.perf_counter()
+    try:
+        if args.incremental:
+            if args.reset:
+                db_manager.clear_export_watermark(args.target or os.path.abspath(args.file))
+            file_path, rows = exporter.export_incremental(args.file, args.progress, filters, args.target,
+                                                          overwrite=args.reset)
+        else:
+            file_path, rows = args.file, exporter.export(args.file, args.progress, filters)
+    except FileExistsError as e:
+        raise CommandError(f"{e}; rerun with --reset to replace it", EXIT_BAD_INPUT)
+    except RuntimeError as e:
+        raise CommandError(str(e))
+    return {"file": file_path, "filters": filters, "rows": rows, "seconds": time.perf_counter() - started}
+
+
+def run_records(db_manager, config_manager, args):
+    filters = record_filters(args)
+    rows = db_manager.fetch_records(limit=args.limit, offset=args.offset, **filters)
+    records = [{"date": date, "lesson": lesson, "day": day, "period": period, "student_id": student_id,
+                "status": status}
+               for date, lesson, day, period, student_id, status in rows]
+    return {"filters": filters, "total": db_manager.count_records(**filters), "records": records}
+
+
+def run_summary(db_manager, config_manager, args):
+    rows = db_manager.fetch_session_summary(args.limit, args.offset, args.filter, args.order_by, args.descending)
+    sessions = [{"session_id": session_id, "date": date, "lesson": lesson, "day": day, "period": period,
+                 "present": present, "absent": absent}
+                for session_id, date, lesson, day, period, present, absent in rows]
+    return {"total": db_manager.count_sessions(args.filter), "sessions": sessions}
+
+
+def run_at_risk(db_manager, config_manager, args):
+    min_rate = config_manager.get_attendance_alert_rate() if args.min_rate is None else args.min_rate
+    rows = db_manager.fetch_at_risk_students(min_rate, args.lesson)
+    students = [{"student_id": student_id, "lesson": lesson, "present": present, "absent": absent, "rate": rate}
+                for student_id, lesson, present, absent, rate in rows]
+    return {"min_rate": min_rate, "students": students}
+
+
+def run_check_summaries(db_manager, config_manager, args):
+    mismatches = db_manager.check_summaries()
+    rebuilt = False
+    if any(mismatches.values()):
+        if not args.rebuild:
+            raise CommandError(f"Attendance summaries are inconsistent: {mismatches}", EXIT_INCONSISTENT)
+        rebuilt = db_manager.rebuild_summaries()
+    return {"mismatches": mismatches, "rebuilt": rebuilt}
+
+
+def run_calendar(db_manager, config_manager, args):
+    from .database.calendar_manager import CalendarManager
+
+    calendar_manager = CalendarManager(db_manager)
+    date = args.date or time.strftime("%Y-%m-%d")
+    lessons = [{"lesson": lesson, "period": period} for lesson, period in calendar_manager.lessons_on(date)]
+    missing = [{"date": missing_date, "lesson": lesson, "period": period}
+               for missing_date, lesson, period in calendar_manager.missing_sessions(args.since, date, args.lesson)]
+    return {"date": date, "lessons": lessons, "missing": missing}
+
+
+def run_archive(db_manager, config_manager, args):
+    from .database.archive_manager import ArchiveManager
+
+    moved = ArchiveManager(db_manager).archive_closed_terms(args.before, args.progress)
+    return {"archived": moved}
+
+
+def run_snapshot(db_manager, config_manager, args):
+    from .database.snapshot_manager import SnapshotManager
+
+    started = time.perf_counter()
+    try:
+        rows = SnapshotManager(db_manager).write(args.path, args.progress)
+    except RuntimeError as e:
+        raise CommandError(str(e))
+    return {"path": args.path, "rows": rows, "seconds": time.perf_counter() - started}
+
+
+def run_load_snapshot(db_manager, config_manager, args):
+    from .database.snapshot_manager import SnapshotManager
+
+    if not os.path.exists(args.path):
+        raise CommandError(f"Snapshot not found: {args.path}", EXIT_BAD_INPUT)
+    snapshot_manager = SnapshotManager(db_manager)
+    started = time.perf_counter()
+    if args.arrays:
+        columns, _ = snapshot_manager.load_arrays(args.path)
+        rows = len(columns["status"])
+    else:
+        rows = len(snapshot_manager.load_dataframe(args.path))
+    return {"path": args.path, "rows": rows, "seconds": time.perf_counter() - started}
+
+
+def run_serve(db_manager, config_manager, args):
+    import asyncio
+    import signal
+    from .server.submission_server import SubmissionServer
+
+    server = SubmissionServer(db_manager, args.host, args.port, args.max_batch_rows)
+
+    async def serve():
+        stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, stopping.set)
+            except NotImplementedError:
+                # Windows: Ctrl+C still arrives as KeyboardInterrupt
+                pass
+        port = await server.start()
+        print(json.dumps({"command": "serve", "listening": f"{args.host}:{port}"}), file=sys.stderr, flush=True)
+        try:
+            await stopping.wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return {"stats": server.stats.snapshot()}
+
+
+def build_parser():
+    save_dir = os.path.join(os.getcwd(), "saving_data")
+    parser = argparse.ArgumentParser(prog="python -m app.cli",
+                                     description="Run imports, exports and reports without the GUI. "
+                                                 "Results are printed to stdout as JSON.")
+    parser.add_argument("--db", default=os.path.join(save_dir, "submission_records.db"))
+    parser.add_argument("--config", default=os.path.join(save_dir, "config.json"))
+    parser.add_argument("--progress", action="store_true", help="report progress on stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="import a .db, .xlsx or .csv file")
+    import_parser.add_argument("type", choices=list(IMPORT_TYPES))
+    import_parser.add_argument("file")
+    import_parser.add_argument("--conflict", choices=list(CONFLICT_MODES), default="skip")
+    import_parser.add_argument("--batch-size", type=int)
+    import_parser.add_argument("--restart", action="store_true", help="ignore a checkpoint from an earlier run")
+    import_parser.set_defaults(handler=run_import)
+
+    export_parser = commands.add_parser("export", help="export submissions to .xlsx, .csv or .parquet")
+    export_parser.add_argument("file")
+    add_record_filter_arguments(export_parser)
+    export_parser.add_argument("--incremental", action="store_true",
+                               help="only rows added or corrected since the last incremental export to this target; "
+                                    ".csv files are appended to, other formats get a timestamped delta file")
+    export_parser.add_argument("--target", help="name the watermark is kept under (default: the file path)")
+    export_parser.add_argument("--reset", action="store_true", help="with --incremental, start over from the "
+                                                                    "full history, replacing an existing .csv")
+    export_parser.set_defaults(handler=run_export)
+
+    records_parser = commands.add_parser("records", help="submission records matching the given filters")
+    add_record_filter_arguments(records_parser)
+    records_parser.add_argument("--limit", type=int)
+    records_parser.add_argument("--offset", type=int, default=0)
+    records_parser.set_defaults(handler=run_records)
+
+    summary_parser = commands.add_parser("summary", help="present and absent counts per session")
+    summary_parser.add_argument("--limit", type=int)
+    summary_parser.add_argument("--offset", type=int, default=0)
+    summary_parser.add_argument("--filter")
+    summary_parser.add_argument("--order-by", choices=["date", "lesson", "day", "period", "present", "absent"],
+                                default="date")
+    summary_parser.add_argument("--descending", action="store_true")
+    summary_parser.set_defaults(handler=run_summary)
+
+    at_risk_parser = commands.add_parser("at-risk", help="students below an attendance rate")
+    at_risk_parser.add_argument("--min-rate", type=float)
+    at_risk_parser.add_argument("--lesson")
+    at_risk_parser.set_defaults(handler=run_at_risk)
+
+    check_parser = commands.add_parser("check-summaries", help="verify the attendance summary tables")
+    check_parser.add_argument("--rebuild", action="store_true", help="rebuild them when they are inconsistent")
+    check_parser.set_defaults(handler=run_check_summaries)
+
+    calendar_parser = commands.add_parser("calendar", help="lessons scheduled on a date and earlier scheduled "
+                                                           "sessions without submissions")
+    calendar_parser.add_argument("--date", help="YYYY-MM-DD (default today)")
+    calendar_parser.add_argument("--since", help="first date to check for missing submissions")
+    calendar_parser.add_argument("--lesson", help="only check this lesson for missing submissions")
+    calendar_parser.set_defaults(handler=run_calendar)
+
+    archive_parser = commands.add_parser("archive", help="move finished terms into per-term archive databases")
+    archive_parser.add_argument("--before", help="archive lessons that ended before this date (default today)")
+    archive_parser.set_defaults(handler=run_archive)
+
+    snapshot_parser = commands.add_parser("snapshot", help="write a columnar snapshot of all submissions "
+                                                           "(a directory of .npy files, or a .parquet file)")
+    snapshot_parser.add_argument("path")
+    snapshot_parser.set_defaults(handler=run_snapshot)
+
+    load_parser = commands.add_parser("load-snapshot", help="time reloading a snapshot written by 'snapshot'")
+    load_parser.add_argument("path")
+    load_parser.add_argument("--arrays", action="store_true", help="load the raw arrays instead of a DataFrame")
+    load_parser.set_defaults(handler=run_load_snapshot)
+
+    serve_parser = commands.add_parser("serve", help="accept presence submissions over the network")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--max-batch-rows", type=int, default=5000)
+    serve_parser.set_defaults(handler=run_serve)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.progress = progress_printer(args.progress)
+    result = {"command": args.command}
+    db_manager = None
+    try:
+        db_dir = os.path.dirname(os.path.abspath(args.db))
+        os.makedirs(db_dir, exist_ok=True)
+        config_manager = ConfigManager(args.config, print_warning)
+        INSTRUMENTATION.configure(config_manager.get_instrumentation_enabled(),
+                                  os.path.join(db_dir, "instrumentation.log"),
+                                  config_manager.get_slow_operation_threshold_ms())
+        db_manager = DatabaseManager(args.db, config_manager.get_database_pragmas(), raise_database_error)
+        started = time.perf_counter()
+        result.update(args.handler(db_manager, config_manager, args))
+        INSTRUMENTATION.record("cli", args.command, time.perf_counter() - started)
+        result["ok"] = True
+        exit_code = EXIT_OK
+    except CommandError as e:
+        result.update(ok=False, error=str(e))
+        exit_code = e.exit_code
+    # Streaming reads and writes raise sqlite3 errors directly rather than through report_error
+    except (DatabaseError, sqlite3.Error, OSError, ValueError) as e:
+        result.update(ok=False, error=str(e))
+        exit_code = EXIT_FAILED
+    finally:
+        if db_manager:
+            db_manager.close()
+    print(json.dumps(result, ensure_ascii=False, default=str))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
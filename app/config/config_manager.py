@@ -1,12 +1,21 @@
 import json
 import os
-from PyQt6.QtWidgets import QMessageBox
 
 class ConfigManager:
-    def __init__(self, config_path):
+    def __init__(self, config_path, warning_handler=None):
         self.config_path = config_path
+        # Receives (title, message) for load problems instead of the message box
+        self.warning_handler = warning_handler
         self.config = self.load_config()
 
+    def warn(self, title, message):
+        if self.warning_handler:
+            self.warning_handler(title, message)
+        else:
+            from PyQt6.QtWidgets import QMessageBox
+
+            QMessageBox.warning(None, title, message)
+
     def load_config(self):
         default_config = {"version": "1.1.0", "developer": "xAI Team"}
         if os.path.exists(self.config_path):
@@ -14,7 +23,7 @@ class ConfigManager:
                 with open(self.config_path, 'r') as f:
                     return json.load(f)
             except Exception as e:
-                QMessageBox.warning(None, "Config Error", f"Failed to load config: {str(e)}. Using default.")
+                self.warn("Config Error", f"Failed to load config: {str(e)}. Using default.")
                 return default_config
         else:
             try:
@@ -22,11 +31,36 @@ class ConfigManager:
                     json.dump(default_config, f, indent=4)
                 return default_config
             except Exception as e:
-                QMessageBox.warning(None, "Config Error", f"Failed to create config: {str(e)}")
+                self.warn("Config Error", f"Failed to create config: {str(e)}")
                 return default_config
 
     def get_version(self):
         return self.config.get("version", "1.1.0")
 
     def get_developer(self):
-        return self.config.get("developer", "xAI Team")
\ No newline at end of file
+        return self.config.get("developer", "xAI Team")
+
+    def get_database_pragmas(self):
+        return self.config.get("database_pragmas", {})
+
+    def get_import_batch_size(self):
+        return self.config.get("import_batch_size", 5000)
+
+    def get_streaming_import_threshold_mb(self):
+        return self.config.get("streaming_import_threshold_mb", 20)
+
+    def get_attendance_alert_rate(self):
+        return self.config.get("attendance_alert_rate", 2 / 3)
+
+    def get_absence_streak_alert(self):
+        return self.config.get("absence_streak_alert", 3)
+
+    def get_instrumentation_enabled(self):
+        return self.config.get("instrumentation_enabled", False)
+
+    def get_slow_operation_threshold_ms(self):
+        return self.config.get("slow_operation_threshold_ms", 500)
+
+    def get_period_start_times(self):
+        # {"1": "08:50", ...}; None falls back to CalendarManager's default timetable
+        return self.config.get("period_start_times")
\ No newline at end of file
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from .db_manager import DatabaseManager, DatabaseError, raise_database_error
+
+
+class ArchiveManager:
+    # Submissions of lessons whose end_date has passed move to one database file per academic term.
+    # DatabaseManager record reads with a date range attach the overlapping term files via partitions_for.
+    def __init__(self, db_manager, archive_dir=None):
+        self.db_manager = db_manager
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(os.path.abspath(db_manager.db_path)),
+                                                       "archive")
+
+    def term_of(self, date_text):
+        # Japanese academic year: the first term runs April-September, the second October-March
+        year, month = int(date_text[:4]), int(date_text[5:7])
+        if month >= 10:
+            return f"{year}-2"
+        if month >= 4:
+            return f"{year}-1"
+        return f"{year - 1}-2"
+
+    def closed_terms(self, before_date=None):
+        # {term: [lesson ids]} for lessons that ended before before_date (default today) and still have sessions
+        before_date = before_date or time.strftime("%Y-%m-%d")
+        cursor = self.db_manager.get_connection().cursor()
+        cursor.execute('''
+            SELECT l.id, l.end_date FROM lessons l
+            WHERE l.end_date IS NOT NULL AND l.end_date <> '' AND l.end_date < ?
+              AND EXISTS (SELECT 1 FROM sessions se WHERE se.lesson_id = l.id)
+            ORDER BY l.end_date
+        ''', (before_date,))
+        terms = {}
+        for lesson_id, end_date in cursor.fetchall():
+            terms.setdefault(self.term_of(end_date), []).append(lesson_id)
+        return terms
+
+    def archive_closed_terms(self, before_date=None, progress=None):
+        # Returns {term: submissions moved}
+        moved = {}
+        for term, lesson_ids in self.closed_terms(before_date).items():
+            moved[term] = self.archive_term(term, lesson_ids)
+            if progress:
+                progress(sum(moved.values()))
+        return moved
+
+    def archive_term(self, term, lesson_ids):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        file_name = f"term_{term}.db"
+        # Opening it once creates the same schema, summary triggers included
+        DatabaseManager(os.path.join(self.archive_dir, file_name), error_handler=raise_database_error).close()
+
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS archive_lessons (id INTEGER PRIMARY KEY)')
+        cursor.execute('DELETE FROM temp.archive_lessons')
+        cursor.executemany('INSERT INTO temp.archive_lessons (id) VALUES (?)', [(lesson_id,) for lesson_id in lesson_ids])
+        conn.commit()
+        sessions = 'SELECT id FROM sessions WHERE lesson_id IN (SELECT id FROM temp.archive_lessons)'
+
+        conn.execute('ATTACH DATABASE ? AS archive', (os.path.join(self.archive_dir, file_name),))
+        try:
+            # Live session ids are reused once the highest ones are archived, so sessions are matched by
+            # (lesson_id, date, period) and get their own ids in the term file. Students, lessons and
+            # submissions keep their live ids, which are never reused; a re-run only fills in what is missing.
+            with conn:
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO archive.students (id, student_id)
+                    SELECT id, student_id FROM students
+                    WHERE id IN (SELECT student_ref FROM submissions WHERE session_id IN ({sessions}))
+                ''')
+                cursor.execute('''
+                    INSERT OR REPLACE INTO archive.lessons (id, name, day, period, begin_date, end_date)
+                    SELECT id, name, day, period, begin_date, end_date FROM lessons
+                    WHERE id IN (SELECT id FROM temp.archive_lessons)
+                ''')
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO archive.sessions (lesson_id, date, day, period)
+                    SELECT lesson_id, date, day, period FROM sessions WHERE id IN ({sessions})
+                ''')
+                # The live row wins over one archived earlier for the same session and student
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO archive.submissions (id, session_id, student_ref, status, submitted_at,
+                                                               change_seq)
+                    SELECT sub.id, ase.id, sub.student_ref, sub.status, sub.submitted_at, sub.change_seq
+                    FROM submissions sub
+                    JOIN sessions se ON se.id = sub.session_id
+                    JOIN archive.sessions ase ON ase.lesson_id = se.lesson_id AND ase.date = se.date
+                                             AND ase.period = se.period
+                    WHERE se.id IN ({sessions})
+                    ON CONFLICT (session_id, student_ref) DO UPDATE SET
+                        status = excluded.status, submitted_at = excluded.submitted_at,
+                        change_seq = excluded.change_seq
+                ''')
+            # The copy is committed and every live row is matched in it before anything is deleted
+            cursor.execute(f'''
+                SELECT COUNT(*), MIN(se.date), MAX(se.date),
+                       SUM(NOT EXISTS (
+                           SELECT 1 FROM archive.submissions asub
+                           JOIN archive.sessions ase ON ase.id = asub.session_id
+                           WHERE ase.lesson_id = se.lesson_id AND ase.date = se.date AND ase.period = se.period
+                             AND asub.student_ref = sub.student_ref AND asub.status = sub.status
+                             AND asub.submitted_at IS sub.submitted_at
+                       ))
+                FROM submissions sub JOIN sessions se ON se.id = sub.session_id
+                WHERE se.id IN ({sessions})
+            ''')
+            moved, first_date, last_date, unmatched = cursor.fetchone()
+            if unmatched:
+                raise DatabaseError(f"Archive copy for term {term} does not match {unmatched} of {moved} rows")
+            with conn:
+                cursor.execute(f'DELETE FROM submissions WHERE session_id IN ({sessions})')
+                cursor.execute(f'DELETE FROM session_summary WHERE session_id IN ({sessions})')
+                cursor.execute('''
+                    DELETE FROM student_lesson_summary
+                    WHERE lesson_id IN (SELECT id FROM temp.archive_lessons) AND present_count = 0 AND absent_count = 0
+                ''')
+                cursor.execute(f'DELETE FROM sessions WHERE id IN ({sessions})')
+                cursor.execute('''
+                    INSERT OR REPLACE INTO archived_lessons (lesson_id, term, archived_through)
+                    SELECT id, ?, end_date FROM lessons WHERE id IN (SELECT id FROM temp.archive_lessons)
+                ''', (term,))
+                if moved:
+                    cursor.execute('''
+                        INSERT INTO archive_partitions (term, file_name, first_date, last_date, row_count)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (term) DO UPDATE SET
+                            first_date = MIN(first_date, excluded.first_date),
+                            last_date = MAX(last_date, excluded.last_date),
+                            row_count = row_count + excluded.row_count
+                    ''', (term, file_name, first_date, last_date, moved))
+            return moved
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to archive term {term}: {str(e)}")
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute('DETACH DATABASE archive')
+
+    def partitions_for(self, start_date=None, end_date=None):
+        # Archive files whose date range overlaps [start_date, end_date]; None leaves that side open
+        cursor = self.db_manager.get_connection().cursor()
+        cursor.execute('''
+            SELECT term, file_name FROM archive_partitions
+            WHERE (? IS NULL OR last_date >= ?) AND (? IS NULL OR first_date <= ?)
+            ORDER BY first_date
+        ''', (start_date, start_date, end_date, end_date))
+        return cursor.fetchall()
+
+    @contextmanager
+    def attached(self, file_name):
+        conn = self.db_manager.get_connection()
+        conn.execute('ATTACH DATABASE ? AS archive', (os.path.join(self.archive_dir, file_name),))
+        try:
+            yield conn.cursor()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute('DETACH DATABASE archive')
\ No newline at end of file
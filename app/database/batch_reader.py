@@ -0,0 +1,80 @@
+import contextlib
+import csv
+import datetime
+import os
+import zipfile
+
+
+class BatchReader:
+    def __init__(self, file_path, batch_size=5000):
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.extension = os.path.splitext(file_path)[1].lower()
+        if self.extension not in (".xlsx", ".csv"):
+            raise ValueError(f"Streaming import supports .xlsx and .csv files, not {self.extension or 'no extension'}")
+
+    def iter_rows(self):
+        # Yields the header first, then data rows, without materializing the sheet.
+        # Files the parsers cannot read raise ValueError, like any other bad input.
+        if self.extension == ".csv":
+            with open(self.file_path, newline="", encoding="utf-8-sig") as f:
+                try:
+                    for row in csv.reader(f):
+                        yield [value if value != "" else None for value in row]
+                except csv.Error as e:
+                    raise ValueError(f"Malformed CSV file {self.file_path}: {str(e)}")
+        else:
+            from openpyxl import load_workbook
+            from openpyxl.utils.exceptions import InvalidFileException
+
+            try:
+                workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+            except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+                # openpyxl raises KeyError for a zip archive that is not a workbook
+                raise ValueError(f"Not a valid .xlsx file {self.file_path}: {str(e)}")
+            try:
+                for row in workbook.active.iter_rows(values_only=True):
+                    yield list(row)
+            finally:
+                workbook.close()
+
+    def header(self):
+        with contextlib.closing(self.iter_rows()) as rows:
+            return self.header_names(next(rows, []))
+
+    def header_names(self, row):
+        return [str(value).strip() if value is not None else "" for value in row]
+
+    def iter_batches(self, columns, key_columns=(), skip_rows=0, timestamp_columns=()):
+        # Values in timestamp_columns keep their time of day
+        rows = self.iter_rows()
+        header = self.header_names(next(rows, []))
+        if not all(column in header for column in columns):
+            raise ValueError(f"Missing required columns: {', '.join(columns)}")
+        positions = [header.index(column) for column in columns]
+        key_positions = [columns.index(column) for column in key_columns]
+        with_time = [column in timestamp_columns for column in columns]
+
+        batch = []
+        for line_number, row in enumerate(rows, 1):
+            if line_number <= skip_rows:
+                continue
+            if not any(value is not None for value in row):
+                continue
+            values = tuple(self.cell_text(row[position], timestamp) if position < len(row) else None
+                           for position, timestamp in zip(positions, with_time))
+            if any(values[position] is None for position in key_positions):
+                raise ValueError(f"Row {line_number + 1}: empty value in {', '.join(key_columns)}")
+            batch.append(values)
+            if len(batch) >= self.batch_size:
+                yield line_number, batch
+                batch = []
+        if batch:
+            yield line_number, batch
+
+    def cell_text(self, value, with_time=False):
+        if value is None:
+            return None
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.strftime("%Y-%m-%d %H:%M:%S" if with_time else "%Y-%m-%d")
+        return str(value)
\ No newline at end of file
@@ -0,0 +1,136 @@
+import datetime
+import re
+import sqlite3
+
+# Accepted spellings of a lesson's day, Monday first to match date.weekday()
+WEEKDAY_NAMES = [
+    ("月曜日", "月", "monday", "mon"),
+    ("火曜日", "火", "tuesday", "tue"),
+    ("水曜日", "水", "wednesday", "wed"),
+    ("木曜日", "木", "thursday", "thu"),
+    ("金曜日", "金", "friday", "fri"),
+    ("土曜日", "土", "saturday", "sat"),
+    ("日曜日", "日", "sunday", "sun")
+]
+WEEKDAYS = {name: weekday for weekday, names in enumerate(WEEKDAY_NAMES) for name in names}
+# Start of each period, overridable via "period_start_times" in config.json
+DEFAULT_PERIOD_START_TIMES = {
+    "1": "08:50", "2": "09:40", "3": "10:40", "4": "11:30",
+    "5": "13:10", "6": "14:00", "7": "15:00", "8": "15:50"
+}
+
+
+class CalendarManager:
+    # Expands every lesson into expected_sessions, one row per scheduled date, so "what is on today" and
+    # "which sessions never got a submission" are index lookups. Only lessons whose revision moved since
+    # the last build are expanded again; every lookup refreshes first, so the table follows lesson edits.
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def expected_dates(self, day, begin_date, end_date):
+        weekday = WEEKDAYS.get((day or "").strip().lower())
+        try:
+            begin = datetime.date.fromisoformat(begin_date or "")
+            end = datetime.date.fromisoformat(end_date or "")
+        except ValueError:
+            return weekday, []
+        if weekday is None:
+            return weekday, []
+        first = begin + datetime.timedelta(days=(weekday - begin.weekday()) % 7)
+        if first > end:
+            return weekday, []
+        return weekday, [(first + datetime.timedelta(weeks=week)).isoformat()
+                         for week in range((end - first).days // 7 + 1)]
+
+    def refresh(self):
+        # Returns the number of lessons expanded
+        try:
+            built = int(self.db_manager.get_meta("calendar_revision", -1))
+            if built == int(self.db_manager.get_meta("lessons_revision", 0)):
+                return 0
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                # The delete opens the write transaction, so no lesson edit lands between the reads below
+                cursor.execute('DELETE FROM expected_sessions WHERE lesson_id NOT IN (SELECT id FROM lessons)')
+                revision = int(self.db_manager.get_meta("lessons_revision", 0))
+                cursor.execute('SELECT id, day, begin_date, end_date FROM lessons WHERE revision > ?', (built,))
+                lessons = cursor.fetchall()
+                for lesson_id, day, begin_date, end_date in lessons:
+                    weekday, dates = self.expected_dates(day, begin_date, end_date)
+                    cursor.execute('DELETE FROM expected_sessions WHERE lesson_id = ?', (lesson_id,))
+                    cursor.executemany('INSERT INTO expected_sessions (lesson_id, date, weekday) VALUES (?, ?, ?)',
+                                       [(lesson_id, date, weekday) for date in dates])
+                self.db_manager.set_meta(cursor, "calendar_revision", revision)
+                return len(lessons)
+        except sqlite3.Error as e:
+            self.db_manager.report_error(f"Failed to build the lesson calendar: {str(e)}")
+            return 0
+
+    def lessons_on(self, date=None):
+        # [(lesson, period)] scheduled on date (default today), in period order
+        date = date or datetime.date.today().isoformat()
+        self.refresh()
+        try:
+            cursor = self.db_manager.get_connection().cursor()
+            cursor.execute('''
+                SELECT l.name, l.period FROM expected_sessions es JOIN lessons l ON l.id = es.lesson_id
+                WHERE es.date = ?
+            ''', (date,))
+            return sorted(cursor.fetchall(), key=lambda lesson: (self.first_period(lesson[1]), lesson[0]))
+        except sqlite3.Error as e:
+            self.db_manager.report_error(f"Failed to read today's lessons: {str(e)}")
+            return []
+
+    def first_period(self, period):
+        # "3-4" -> 3; periods without a number sort last
+        match = re.match(r"\s*(\d+)", period or "")
+        return int(match.group(1)) if match else 99
+
+    def current_lesson(self, now=None, period_start_times=None):
+        # The lesson on now's date whose first period started most recently, or the day's first lesson
+        # before any has started; None when nothing is scheduled
+        now = now or datetime.datetime.now()
+        start_times = period_start_times or DEFAULT_PERIOD_START_TIMES
+        lessons = self.lessons_on(now.date().isoformat())
+        current = lessons[0][0] if lessons else None
+        clock = now.strftime("%H:%M")
+        for name, period in lessons:
+            start = start_times.get(str(self.first_period(period)))
+            if start and start <= clock:
+                current = name
+        return current
+
+    def missing_sessions(self, start_date=None, before_date=None, lesson_name=None):
+        # [(date, lesson, period)] scheduled from start_date (default the first) and before before_date
+        # (default today) without any submission. Dates a lesson's archive covers are skipped, since
+        # those sessions are no longer in the live database.
+        before_date = before_date or datetime.date.today().isoformat()
+        self.refresh()
+        try:
+            cursor = self.db_manager.get_connection().cursor()
+            clauses = ["es.date < ?"]
+            params = [before_date]
+            if start_date:
+                clauses.append("es.date >= ?")
+                params.append(start_date)
+            if lesson_name:
+                clauses.append("es.lesson_id = (SELECT id FROM lessons WHERE name = ?)")
+                params.append(lesson_name)
+            cursor.execute(f'''
+                SELECT es.date, l.name, l.period FROM expected_sessions es JOIN lessons l ON l.id = es.lesson_id
+                WHERE {" AND ".join(clauses)}
+                  AND NOT EXISTS (
+                      SELECT 1 FROM archived_lessons a
+                      WHERE a.lesson_id = es.lesson_id AND es.date <= a.archived_through
+                  )
+                  AND NOT EXISTS (
+                      SELECT 1 FROM sessions se JOIN session_summary ss ON ss.session_id = se.id
+                      WHERE se.lesson_id = es.lesson_id AND se.date = es.date
+                        AND ss.present_count + ss.absent_count > 0
+                  )
+                ORDER BY es.date, l.name
+            ''', params)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.db_manager.report_error(f"Failed to find missing submissions: {str(e)}")
+            return []
\ No newline at end of file
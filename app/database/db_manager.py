@@ -1,65 +1,619 @@
+import heapq
+import itertools
+import os
 import sqlite3
-import pandas as pd
-from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import QDate
+import threading
+import time
+from contextlib import closing
+from .batch_reader import BatchReader
+from ..utils.instrumentation import INSTRUMENTATION
+
+# Applied once to every connection; overridable via "database_pragmas" in config.json
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000
+}
+
+SCHEMA_VERSION = 7
+STATUS_ABSENT = 0
+STATUS_PRESENT = 1
+# Stays below SQLite's default limit on bound parameters
+PARAMETER_CHUNK_SIZE = 900
+# Long writes report progress (and can be cancelled) between chunks of this many rows
+WRITE_CHUNK_SIZE = 10000
+ATTACH_CHUNK_SIZE = 50000
+LESSON_COLUMNS = ["name", "day", "period", "begin_date", "end_date"]
+STUDENT_UPSERT = '''
+    INSERT INTO students (student_id, in_roster) VALUES (?, 1)
+    ON CONFLICT (student_id) DO UPDATE SET in_roster = 1
+'''
+PRESENCE_COLUMNS = ["date", "lesson", "day", "period", "student_id", "status"]
+# Optional presence column with when each submission was made, under either name; "newest" compares it
+SUBMITTED_AT_COLUMNS = ["submitted_at", "timestamp"]
+LESSON_UPSERT = '''
+    INSERT INTO lessons (name, day, period, begin_date, end_date)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (name) DO UPDATE SET day = excluded.day, period = excluded.period,
+        begin_date = excluded.begin_date, end_date = excluded.end_date
+'''
+SUMMARY_SORT_COLUMNS = {
+    "date": ("se.date", "l.name", "se.period"),
+    "lesson": ("l.name", "se.date", "se.period"),
+    "day": ("se.day", "se.date"),
+    "period": ("se.period", "se.date"),
+    "present": ("ss.present_count", "se.date"),
+    "absent": ("ss.absent_count", "se.date")
+}
+# Submission rows in export order, led by sub.id so archive and live parts can be merged;
+# {schema} is main or an attached archive, {where} comes from record_filter
+RECORD_QUERY = f'''
+    SELECT sub.id, se.date, l.name, se.day, se.period, st.student_id,
+           CASE sub.status WHEN {STATUS_PRESENT} THEN 'Present' ELSE 'Absent' END
+    FROM {{schema}}.submissions sub
+    JOIN {{schema}}.sessions se ON se.id = sub.session_id
+    JOIN {{schema}}.lessons l ON l.id = se.lesson_id
+    JOIN {{schema}}.students st ON st.id = sub.student_ref
+    {{where}}
+    ORDER BY sub.id
+'''
+RECORD_STATUSES = ["Present", "Absent"]
+# What the summary tables should contain, computed from submissions
+SUMMARY_QUERIES = {
+    "session_summary": f'''
+        SELECT session_id, SUM(status = {STATUS_PRESENT}), SUM(status <> {STATUS_PRESENT})
+        FROM submissions GROUP BY session_id
+    ''',
+    "student_lesson_summary": f'''
+        SELECT sub.student_ref, se.lesson_id,
+               SUM(sub.status = {STATUS_PRESENT}), SUM(sub.status <> {STATUS_PRESENT})
+        FROM submissions sub JOIN sessions se ON se.id = sub.session_id
+        GROUP BY sub.student_ref, se.lesson_id
+    '''
+}
+
+# Staging rows are normalized here so the merge joins never see NULL keys
+STAGING_INSERT = '''
+    INSERT INTO temp.submission_staging (date, lesson, day, period, student_id, status)
+    VALUES (COALESCE(?, ''), COALESCE(?, ''), ?, COALESCE(?, ''), COALESCE(?, ''), ?)
+'''
+# The same with a seventh submitted_at value, written "YYYY-MM-DD HH:MM:SS" like the stored ones
+STAGING_INSERT_TIMESTAMPED = '''
+    INSERT INTO temp.submission_staging (date, lesson, day, period, student_id, status, submitted_at)
+    VALUES (COALESCE(?, ''), COALESCE(?, ''), ?, COALESCE(?, ''), COALESCE(?, ''), ?, REPLACE(?, 'T', ' '))
+'''
+STAGING_INSERT_SELECT = '''
+    INSERT INTO temp.submission_staging (date, lesson, day, period, student_id, status, submitted_at)
+    SELECT COALESCE(date, ''), COALESCE(lesson, ''), day, COALESCE(period, ''), COALESCE(student_id, ''), status,
+           submitted_at
+    FROM ({select})
+'''
+# How a staged row is applied when its (date, lesson, period, student_id) already exists
+CONFLICT_MODES = {
+    "skip": "DO NOTHING",
+    "overwrite": '''DO UPDATE SET status = excluded.status, submitted_at = excluded.submitted_at,
+        change_seq = excluded.change_seq''',
+    "newest": '''DO UPDATE SET status = excluded.status, submitted_at = excluded.submitted_at,
+        change_seq = excluded.change_seq
+        WHERE excluded.submitted_at > COALESCE(submissions.submitted_at, '')'''
+}
+
+
+def imported_rows(db_manager, success):
+    return db_manager.last_import_stats["rows"] if success else None
+
+
+class DatabaseError(Exception):
+    pass
+
+
+# error_handler for DatabaseManager users without a GUI, e.g. the CLI, benchmarks and tests
+def raise_database_error(message):
+    raise DatabaseError(message)
+
+
+class OperationCancelled(Exception):
+    pass
+
 
 class DatabaseManager:
-    def __init__(self, db_path):
+    def __init__(self, db_path, pragmas=None, error_handler=None):
         self.db_path = db_path
+        # Receives every error message instead of the message box, e.g. to run without Qt
+        self.error_handler = error_handler
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.last_import_stats = None
+        self.roster = {}
         self.init_database()
+        self.load_roster()
+
+    def get_connection(self):
+        # One long-lived connection per thread; "with conn:" still commits or rolls back
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            if INSTRUMENTATION.enabled:
+                conn.set_trace_callback(INSTRUMENTATION.trace_sql)
+            self.apply_pragmas(conn)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def apply_pragmas(self, conn):
+        cursor = conn.cursor()
+        for name, value in self.pragmas.items():
+            if not str(name).isidentifier() or not str(value).lstrip("-").isalnum():
+                raise ValueError(f"Invalid pragma: {name} = {value}")
+            cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.fetchall()
+
+    def close_thread_connection(self):
+        # Closes the calling thread's connection, for worker threads that will not be reused
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        del self._local.conn
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def report_error(self, message):
+        # Message boxes may only be shown from the GUI thread; workers get the error raised instead
+        if self.error_handler:
+            self.error_handler(message)
+        elif threading.current_thread() is threading.main_thread():
+            from PyQt6.QtWidgets import QMessageBox
+
+            QMessageBox.critical(None, "Error", message)
+        else:
+            raise DatabaseError(message)
+
+    def executemany_in_chunks(self, cursor, sql, rows, progress=None):
+        for start in range(0, len(rows), WRITE_CHUNK_SIZE):
+            cursor.executemany(sql, rows[start:start + WRITE_CHUNK_SIZE])
+            if progress:
+                progress(min(start + WRITE_CHUNK_SIZE, len(rows)))
 
+    @INSTRUMENTATION.timed
     def init_database(self):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS submissions (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        date TEXT,
-                        lesson TEXT,
-                        day TEXT,
-                        period TEXT,
-                        student_id TEXT,
-                        status TEXT
-                    )
-                ''')
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS lessons (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT UNIQUE,
-                        day TEXT,
-                        period TEXT,
-                        begin_date TEXT,
-                        end_date TEXT
-                    )
+                cursor.execute('BEGIN')
+                version = cursor.execute('PRAGMA user_version').fetchone()[0]
+                legacy = self.has_legacy_submissions(cursor)
+                if legacy:
+                    cursor.execute('ALTER TABLE submissions RENAME TO submissions_v1')
+                else:
+                    if 0 < version < 3:
+                        self.migrate_to_v3(cursor)
+                    if 0 < version < 4:
+                        self.migrate_to_v4(cursor)
+                    if 0 < version < 7:
+                        self.migrate_to_v7(cursor)
+                if version < 5:
+                    self.migrate_to_v5(cursor)
+                self.create_schema(cursor)
+                if legacy:
+                    self.migrate_legacy_submissions(cursor)
+                elif 0 < version < 6:
+                    # Existing submissions predate the summary triggers
+                    self.fill_summaries(cursor)
+                if not legacy and 0 < version < 7:
+                    # app_meta only exists from here on for files older than v5
+                    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM submissions')
+                    self.set_meta(cursor, "submissions_change_seq", cursor.fetchone()[0])
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to initialize database: {str(e)}")
+
+    def has_legacy_submissions(self, cursor, schema="main"):
+        cursor.execute(f'PRAGMA {schema}.table_info(submissions)')
+        columns = {row[1] for row in cursor.fetchall()}
+        return "lesson" in columns
+
+    def create_schema(self, cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS students (
+                id INTEGER PRIMARY KEY,
+                student_id TEXT NOT NULL UNIQUE,
+                in_roster INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS enrollments (
+                lesson_id INTEGER NOT NULL REFERENCES lessons (id),
+                student_ref INTEGER NOT NULL REFERENCES students (id),
+                PRIMARY KEY (lesson_id, student_ref)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS app_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lessons (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE,
+                day TEXT,
+                period TEXT,
+                begin_date TEXT,
+                end_date TEXT,
+                revision INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY,
+                lesson_id INTEGER NOT NULL REFERENCES lessons (id),
+                date TEXT NOT NULL,
+                day TEXT,
+                period TEXT NOT NULL,
+                UNIQUE (lesson_id, date, period)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER NOT NULL REFERENCES sessions (id),
+                student_ref INTEGER NOT NULL REFERENCES students (id),
+                status INTEGER NOT NULL,
+                submitted_at TEXT,
+                change_seq INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS session_summary (
+                session_id INTEGER PRIMARY KEY REFERENCES sessions (id),
+                present_count INTEGER NOT NULL DEFAULT 0,
+                absent_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS student_lesson_summary (
+                student_ref INTEGER NOT NULL REFERENCES students (id),
+                lesson_id INTEGER NOT NULL REFERENCES lessons (id),
+                present_count INTEGER NOT NULL DEFAULT 0,
+                absent_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (student_ref, lesson_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS import_checkpoints (
+                source_path TEXT NOT NULL,
+                import_type TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_mtime REAL NOT NULL,
+                rows_done INTEGER NOT NULL,
+                PRIMARY KEY (source_path, import_type)
+            )
+        ''')
+        # One row per date a lesson is scheduled, expanded from its day and begin/end dates by CalendarManager
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS expected_sessions (
+                lesson_id INTEGER NOT NULL REFERENCES lessons (id),
+                date TEXT NOT NULL,
+                weekday INTEGER NOT NULL,
+                PRIMARY KEY (lesson_id, date)
+            ) WITHOUT ROWID
+        ''')
+        # Lessons whose sessions were moved to an archive file, through the lesson's end date at that time
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archived_lessons (
+                lesson_id INTEGER PRIMARY KEY REFERENCES lessons (id),
+                term TEXT NOT NULL,
+                archived_through TEXT NOT NULL
+            )
+        ''')
+        # Highest submissions.change_seq already written to each incremental export target
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS export_watermarks (
+                target TEXT PRIMARY KEY,
+                last_seq INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                exported_at TEXT NOT NULL
+            )
+        ''')
+        # Closed terms moved out by ArchiveManager, with the date range each file covers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive_partitions (
+                term TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                first_date TEXT NOT NULL,
+                last_date TEXT NOT NULL,
+                row_count INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions (date, lesson_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_expected_sessions_date ON expected_sessions (date, lesson_id)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_submissions_session
+            ON submissions (session_id, status, student_ref)
+        ''')
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_natural_key
+            ON submissions (session_id, student_ref)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_submissions_student
+            ON submissions (student_ref, session_id, status)
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_change_seq ON submissions (change_seq)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_student_lesson_summary_lesson
+            ON student_lesson_summary (lesson_id)
+        ''')
+        # Flat view with the same columns as the v1 submissions table
+        cursor.execute(f'''
+            CREATE VIEW IF NOT EXISTS submission_records AS
+            SELECT sub.id AS id, se.date AS date, l.name AS lesson, se.day AS day, se.period AS period,
+                   st.student_id AS student_id,
+                   CASE sub.status WHEN {STATUS_PRESENT} THEN 'Present' ELSE 'Absent' END AS status
+            FROM submissions sub
+            JOIN sessions se ON se.id = sub.session_id
+            JOIN lessons l ON l.id = se.lesson_id
+            JOIN students st ON st.id = sub.student_ref
+        ''')
+        # Every lesson change bumps a global revision and stamps the row, so caches can fetch only changed rows
+        for event, when in (("INSERT", "INSERT"), ("UPDATE", "UPDATE OF name, day, period, begin_date, end_date"),
+                            ("DELETE", "DELETE")):
+            stamp = "" if event == "DELETE" else '''
+                UPDATE lessons SET revision = (SELECT value FROM app_meta WHERE key = 'lessons_revision')
+                WHERE id = NEW.id;
+            '''
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS lessons_revision_{event.lower()} AFTER {when} ON lessons
+                BEGIN
+                    INSERT INTO app_meta (key, value) VALUES ('lessons_revision', 1)
+                    ON CONFLICT (key) DO UPDATE SET value = value + 1;
+                    {stamp}
+                END
+            ''')
+        # Summaries follow every submission write, so reports never aggregate raw rows
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS submissions_summary_insert AFTER INSERT ON submissions
+            BEGIN
+                {self.summary_deltas("NEW", "+")}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS submissions_summary_delete AFTER DELETE ON submissions
+            BEGIN
+                {self.summary_deltas("OLD", "-")}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS submissions_summary_update
+            AFTER UPDATE OF session_id, student_ref, status ON submissions
+            BEGIN
+                {self.summary_deltas("OLD", "-")}
+                {self.summary_deltas("NEW", "+")}
+            END
+        ''')
+
+    def summary_deltas(self, row, sign):
+        # Trigger body adding (+) or removing (-) the NEW or OLD submission row from both summaries
+        present = f"{sign}({row}.status = {STATUS_PRESENT})"
+        absent = f"{sign}({row}.status <> {STATUS_PRESENT})"
+        return f'''
+            INSERT INTO session_summary (session_id, present_count, absent_count)
+            VALUES ({row}.session_id, {present}, {absent})
+            ON CONFLICT (session_id) DO UPDATE SET
+                present_count = present_count + excluded.present_count,
+                absent_count = absent_count + excluded.absent_count;
+            INSERT INTO student_lesson_summary (student_ref, lesson_id, present_count, absent_count)
+            SELECT {row}.student_ref, se.lesson_id, {present}, {absent}
+            FROM sessions se WHERE se.id = {row}.session_id
+            ON CONFLICT (student_ref, lesson_id) DO UPDATE SET
+                present_count = present_count + excluded.present_count,
+                absent_count = absent_count + excluded.absent_count;
+        '''
+
+    def migrate_legacy_submissions(self, cursor):
+        self.prepare_staging(cursor)
+        cursor.execute(STAGING_INSERT_SELECT.format(
+            select='''
+                SELECT date, lesson, day, period, student_id, status, NULL AS submitted_at
+                FROM submissions_v1 ORDER BY id
+            '''))
+        # Later duplicates of the same student and session replace earlier ones
+        self.merge_staging(cursor, "overwrite")
+        cursor.execute('DROP TABLE submissions_v1')
+
+    def migrate_to_v3(self, cursor):
+        cursor.execute('ALTER TABLE submissions ADD COLUMN submitted_at TEXT')
+        self.compact_duplicate_submissions(cursor)
+
+    def migrate_to_v4(self, cursor):
+        # Students seen only in attendance history stay out of the roster
+        cursor.execute('ALTER TABLE students ADD COLUMN in_roster INTEGER NOT NULL DEFAULT 0')
+
+    def migrate_to_v5(self, cursor):
+        # Also reached from v1 files, whose lessons table predates every other migration
+        cursor.execute('PRAGMA table_info(lessons)')
+        columns = {row[1] for row in cursor.fetchall()}
+        if columns and "revision" not in columns:
+            cursor.execute('ALTER TABLE lessons ADD COLUMN revision INTEGER NOT NULL DEFAULT 0')
+
+    def migrate_to_v7(self, cursor):
+        # Existing rows count as changed when they were inserted, so watermarks taken on ids stay valid
+        cursor.execute('ALTER TABLE submissions ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0')
+        cursor.execute('UPDATE submissions SET change_seq = id')
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'export_watermarks'")
+        if cursor.fetchone():
+            cursor.execute('ALTER TABLE export_watermarks RENAME COLUMN last_id TO last_seq')
+
+    def fill_summaries(self, cursor):
+        for table, query in SUMMARY_QUERIES.items():
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(f'INSERT INTO {table} {query}')
+
+    @INSTRUMENTATION.timed
+    def rebuild_summaries(self):
+        try:
+            with self.get_connection() as conn:
+                self.fill_summaries(conn.cursor())
+            return True
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to rebuild summaries: {str(e)}")
+            return False
+
+    @INSTRUMENTATION.timed
+    def check_summaries(self):
+        # Rows that differ between each summary table and a fresh aggregate; all zero when consistent
+        try:
+            cursor = self.get_connection().cursor()
+            mismatches = {}
+            for table, query in SUMMARY_QUERIES.items():
+                # Zero-count rows are left behind by deletes and carry no information
+                stored = f'SELECT * FROM {table} WHERE present_count <> 0 OR absent_count <> 0'
+                cursor.execute(f'''
+                    SELECT (SELECT COUNT(*) FROM ({stored} EXCEPT {query}))
+                         + (SELECT COUNT(*) FROM ({query} EXCEPT {stored}))
                 ''')
-                conn.commit()
+                mismatches[table] = cursor.fetchone()[0]
+            return mismatches
         except sqlite3.Error as e:
-            QMessageBox.critical(None, "Error", f"Failed to initialize database: {str(e)}")
+            self.report_error(f"Failed to check summaries: {str(e)}")
+            return None
+
+    def compact_duplicate_submissions(self, cursor):
+        # One-time pass before the natural-key index exists: keep the latest row per student and session
+        cursor.execute('''
+            DELETE FROM submissions WHERE id NOT IN (
+                SELECT MAX(id) FROM submissions GROUP BY session_id, student_ref
+            )
+        ''')
+        return cursor.rowcount
+
+    def prepare_staging(self, cursor):
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS submission_staging (
+                date TEXT, lesson TEXT, day TEXT, period TEXT, student_id TEXT, status TEXT, submitted_at TEXT
+            )
+        ''')
+        cursor.execute('DELETE FROM temp.submission_staging')
 
+    def merge_staging(self, cursor, conflict="skip", submitted_at=None):
+        cursor.execute('''
+            INSERT OR IGNORE INTO students (student_id)
+            SELECT DISTINCT student_id FROM temp.submission_staging
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO lessons (name, day, period)
+            SELECT lesson, day, period FROM temp.submission_staging GROUP BY lesson
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO sessions (lesson_id, date, day, period)
+            SELECT l.id, s.date, s.day, s.period
+            FROM temp.submission_staging s JOIN lessons l ON l.name = s.lesson
+            GROUP BY l.id, s.date, s.period
+        ''')
+        # Every merge is one step of the change sequence; rows it inserts or updates carry that step,
+        # so incremental exports also pick up corrections to rows they already wrote
+        cursor.execute('''
+            INSERT INTO app_meta (key, value) VALUES ('submissions_change_seq', 1)
+            ON CONFLICT (key) DO UPDATE SET value = value + 1
+        ''')
+        cursor.execute(f'''
+            INSERT INTO submissions (session_id, student_ref, status, submitted_at, change_seq)
+            SELECT se.id, st.id, CASE WHEN s.status = 'Present' THEN {STATUS_PRESENT} ELSE {STATUS_ABSENT} END,
+                   COALESCE(s.submitted_at, ?),
+                   (SELECT value FROM app_meta WHERE key = 'submissions_change_seq')
+            FROM temp.submission_staging s
+            JOIN lessons l ON l.name = s.lesson
+            JOIN sessions se ON se.lesson_id = l.id AND se.date = s.date AND se.period = s.period
+            JOIN students st ON st.student_id = s.student_id
+            WHERE true
+            ORDER BY s.rowid
+            ON CONFLICT (session_id, student_ref) {CONFLICT_MODES[conflict]}
+        ''', (submitted_at,))
+        inserted = cursor.rowcount
+        if not inserted:
+            # Nothing changed, so the step is given back and incremental exports have nothing to do
+            cursor.execute("UPDATE app_meta SET value = value - 1 WHERE key = 'submissions_change_seq'")
+        cursor.execute('DELETE FROM temp.submission_staging')
+        return inserted
+
+    def insert_submission_rows(self, cursor, rows, progress=None, conflict="skip", submitted_at=None):
+        # Rows are PRESENCE_COLUMNS values, optionally followed by their own submitted_at
+        rows = list(rows)
+        self.prepare_staging(cursor)
+        statement = STAGING_INSERT_TIMESTAMPED if rows and len(rows[0]) > len(PRESENCE_COLUMNS) else STAGING_INSERT
+        self.executemany_in_chunks(cursor, statement, rows, progress)
+        return self.merge_staging(cursor, conflict, submitted_at)
+
+    def presence_columns(self, header, conflict):
+        # PRESENCE_COLUMNS plus the file's submitted_at column when it has one
+        timestamp_column = next((column for column in SUBMITTED_AT_COLUMNS if column in header), None)
+        if timestamp_column is None and conflict == "newest":
+            raise ValueError(f"Keeping the newest submission needs a {' or '.join(SUBMITTED_AT_COLUMNS)} column")
+        return PRESENCE_COLUMNS + ([timestamp_column] if timestamp_column else [])
+
+    @INSTRUMENTATION.timed
     def load_lessons(self):
-        lessons = {}
+        return {lesson["name"]: lesson for lesson in self.lesson_changes_since(None)[1].values()}
+
+    @INSTRUMENTATION.timed
+    def lesson_changes_since(self, revision):
+        # Returns (current revision, {id: lesson} changed after revision, {id: name} of every lesson) for a
+        # caller holding revision, or every lesson when revision is None. The names are None when nothing
+        # changed, so an unchanged caller reads only the revision.
+        from PyQt6.QtCore import QDate
+
+        changed = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT name, day, period, begin_date, end_date FROM lessons')
-                for name, day, period, begin_date, end_date in cursor.fetchall():
-                    begin_date_obj = QDate.fromString(begin_date, "yyyy-MM-dd")
-                    end_date_obj = QDate.fromString(end_date, "yyyy-MM-dd")
-                    lessons[name] = {
-                        "name": name,
-                        "day": day,
-                        "period": period,
-                        "begin_date": begin_date_obj,
-                        "end_date": end_date_obj
-                    }
-        except sqlite3.Error as e:
-            QMessageBox.critical(None, "Error", f"Failed to load lessons: {str(e)}")
-        return lessons
+            cursor = self.get_connection().cursor()
+            current = int(self.get_meta("lessons_revision", 0))
+            if current == revision:
+                return revision, changed, None
+            cursor.execute('''
+                SELECT id, name, day, period, begin_date, end_date FROM lessons
+                WHERE revision > ? OR ? ORDER BY id
+            ''', (revision or 0, revision is None))
+            for lesson_id, name, day, period, begin_date, end_date in cursor.fetchall():
+                changed[lesson_id] = {
+                    "name": name,
+                    "day": day,
+                    "period": period,
+                    "begin_date": QDate.fromString(begin_date or "", "yyyy-MM-dd"),
+                    "end_date": QDate.fromString(end_date or "", "yyyy-MM-dd")
+                }
+            cursor.execute('SELECT id, name FROM lessons')
+            return current, changed, dict(cursor.fetchall())
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to load lessons: {str(e)}")
+            return revision, {}, None
 
+    @INSTRUMENTATION.timed
     def update_lesson(self, old_name, new_data):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
                 if old_name:
                     cursor.execute('''
@@ -72,138 +626,674 @@ class DatabaseManager:
                     cursor.execute('''
                         INSERT INTO lessons (name, day, period, begin_date, end_date)
                         VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (name) DO UPDATE SET day = excluded.day, period = excluded.period,
+                            begin_date = excluded.begin_date, end_date = excluded.end_date
                     ''', (new_data["name"], new_data["day"], new_data["period"],
                           new_data["begin_date"].toString("yyyy-MM-dd"),
                           new_data["end_date"].toString("yyyy-MM-dd")))
                 conn.commit()
         except sqlite3.Error as e:
-            QMessageBox.critical(None, "Error", f"Failed to update lesson: {str(e)}")
+            self.report_error(f"Failed to update lesson: {str(e)}")
 
+    @INSTRUMENTATION.timed
     def save_submissions(self, submissions):
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.executemany('''
-                    INSERT INTO submissions (date, lesson, day, period, student_id, status)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', submissions)
-                conn.commit()
+                # A repeated final submission for the same session corrects the earlier one
+                self.insert_submission_rows(cursor, submissions, conflict="overwrite",
+                                            submitted_at=time.strftime("%Y-%m-%d %H:%M:%S"))
             return True
         except sqlite3.Error as e:
-            QMessageBox.critical(None, "Error", f"Failed to save submissions: {str(e)}")
+            self.report_error(f"Failed to save submissions: {str(e)}")
             return False
 
-    def fetch_records(self):
+    def record_filter(self, lesson_name=None, student_id=None, status=None, start_date=None, end_date=None,
+                      after_seq=None, through_seq=None, schema="main"):
+        # Only the filters that are set reach the WHERE clause, so SQLite can pick the matching index:
+        # student -> idx_submissions_student, lesson -> the sessions (lesson_id, date, period) key,
+        # date range -> idx_sessions_date. Names are resolved to ids once by the scalar subqueries.
+        clauses = []
+        params = []
+        if lesson_name:
+            clauses.append(f"se.lesson_id = (SELECT id FROM {schema}.lessons WHERE name = ?)")
+            params.append(lesson_name)
+        if student_id:
+            clauses.append(f"sub.student_ref = (SELECT id FROM {schema}.students WHERE student_id = ?)")
+            params.append(student_id)
+        if status:
+            if status not in RECORD_STATUSES:
+                raise ValueError(f"Unknown status: {status}")
+            clauses.append(f"sub.status {'=' if status == 'Present' else '<>'} {STATUS_PRESENT}")
+        if start_date:
+            clauses.append("se.date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("se.date <= ?")
+            params.append(end_date)
+        # Change sequence range for incremental exports -> idx_submissions_change_seq
+        if after_seq:
+            clauses.append("sub.change_seq > ?")
+            params.append(after_seq)
+        if through_seq is not None:
+            clauses.append("sub.change_seq <= ?")
+            params.append(through_seq)
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def record_schemas(self, start_date=None, end_date=None):
+        # Yields the schema a record query runs against: each archive file whose term overlaps the date
+        # range, attached one at a time and oldest first, then the live database. Reads without a range
+        # stay on the live database, which holds every term that has not been archived.
+        if start_date or end_date:
+            from .archive_manager import ArchiveManager
+
+            archive_manager = ArchiveManager(self)
+            for term, file_name in archive_manager.partitions_for(start_date, end_date):
+                if not os.path.exists(os.path.join(archive_manager.archive_dir, file_name)):
+                    raise sqlite3.OperationalError(f"Archive file for term {term} is missing: {file_name}")
+                with archive_manager.attached(file_name):
+                    yield "archive"
+        yield "main"
+
+    def query_records(self, cursor, filters, suffix="", suffix_params=()):
+        # [rows per schema], each ordered by submission id; filters are the record_filter keywords
+        parts = []
+        with closing(self.record_schemas(filters.get("start_date"), filters.get("end_date"))) as schemas:
+            for schema in schemas:
+                where, params = self.record_filter(**filters, schema=schema)
+                cursor.execute(RECORD_QUERY.format(schema=schema, where=where) + suffix, params + list(suffix_params))
+                parts.append(cursor.fetchall())
+        return parts
+
+    @INSTRUMENTATION.timed
+    def fetch_records(self, lesson_name=None, student_id=None, status=None, start_date=None, end_date=None,
+                      limit=None, offset=0):
+        # (date, lesson, day, period, student_id, status) matching every given filter, in submission order.
+        # A date range also reads the archived terms it overlaps.
+        filters = {"lesson_name": lesson_name, "student_id": student_id, "status": status,
+                   "start_date": start_date, "end_date": end_date}
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT date, lesson, day, period, student_id, status FROM submissions')
-                return cursor.fetchall()
+                if not (start_date or end_date):
+                    (rows,) = self.query_records(cursor, filters, ' LIMIT ? OFFSET ?',
+                                                 [-1 if limit is None else limit, offset])
+                    return [row[1:] for row in rows]
+                # Archived rows keep their live ids, so merging the id-ordered parts keeps submission order
+                parts = self.query_records(cursor, filters, ' LIMIT ?', [-1 if limit is None else offset + limit])
+                rows = itertools.islice(heapq.merge(*parts), offset, None if limit is None else offset + limit)
+                return [row[1:] for row in rows]
         except sqlite3.Error as e:
-            QMessageBox.critical(None, "Error", f"Failed to read records: {str(e)}")
+            self.report_error(f"Failed to read records: {str(e)}")
             return []
 
-    def fetch_submissions_for_export(self):
+    @INSTRUMENTATION.timed
+    def count_records(self, lesson_name=None, student_id=None, status=None, start_date=None, end_date=None):
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                count = 0
+                with closing(self.record_schemas(start_date, end_date)) as schemas:
+                    for schema in schemas:
+                        where, params = self.record_filter(lesson_name, student_id, status, start_date, end_date,
+                                                           schema=schema)
+                        cursor.execute(f'''
+                            SELECT COUNT(*) FROM {schema}.submissions sub
+                            JOIN {schema}.sessions se ON se.id = sub.session_id {where}
+                        ''', params)
+                        count += cursor.fetchone()[0]
+                return count
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to count records: {str(e)}")
+            return 0
+
+    def session_summary_filter(self, filter_text):
+        where = "WHERE ss.present_count + ss.absent_count > 0"
+        params = []
+        if filter_text:
+            where += " AND (l.name LIKE ? OR se.date LIKE ? OR se.day LIKE ?)"
+            params = [f"%{filter_text}%"] * 3
+        return where, params
+
+    @INSTRUMENTATION.timed
+    def count_sessions(self, filter_text=None):
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                where, params = self.session_summary_filter(filter_text)
+                cursor.execute(f'''
+                    SELECT COUNT(*) FROM session_summary ss
+                    JOIN sessions se ON se.id = ss.session_id
+                    JOIN lessons l ON l.id = se.lesson_id {where}
+                ''', params)
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to count sessions: {str(e)}")
+            return 0
+
+    @INSTRUMENTATION.timed
+    def fetch_session_summary(self, limit=None, offset=0, filter_text=None, order_by="date", descending=False):
+        # Counts come from session_summary, so a page costs the same however many submissions exist
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT date, lesson, day, period, student_id, status FROM submissions')
+                where, params = self.session_summary_filter(filter_text)
+                direction = "DESC" if descending else "ASC"
+                order = ", ".join(f"{column} {direction}" for column in SUMMARY_SORT_COLUMNS[order_by])
+                cursor.execute(f'''
+                    SELECT se.id, se.date, l.name, se.day, se.period, ss.present_count, ss.absent_count
+                    FROM sessions se
+                    JOIN session_summary ss ON ss.session_id = se.id
+                    JOIN lessons l ON l.id = se.lesson_id
+                    {where}
+                    ORDER BY {order}, se.id {direction}
+                    LIMIT ? OFFSET ?
+                ''', params + [-1 if limit is None else limit, offset])
                 return cursor.fetchall()
         except sqlite3.Error as e:
-            QMessageBox.critical(None, "Error", f"Failed to fetch submissions: {str(e)}")
+            self.report_error(f"Failed to read record summary: {str(e)}")
+            return []
+
+    @INSTRUMENTATION.timed
+    def fetch_at_risk_students(self, min_rate=0.7, lesson_name=None):
+        # (student_id, lesson, present, absent, rate) below min_rate, lowest attendance first
+        try:
+            cursor = self.get_connection().cursor()
+            lesson_filter = "AND l.name = ?" if lesson_name else ""
+            cursor.execute(f'''
+                SELECT st.student_id, l.name, sls.present_count, sls.absent_count,
+                       CAST(sls.present_count AS REAL) / (sls.present_count + sls.absent_count) AS rate
+                FROM student_lesson_summary sls
+                JOIN lessons l ON l.id = sls.lesson_id
+                JOIN students st ON st.id = sls.student_ref
+                WHERE sls.present_count + sls.absent_count > 0
+                  AND sls.present_count < ? * (sls.present_count + sls.absent_count) {lesson_filter}
+                ORDER BY rate, l.name, st.student_id
+            ''', [min_rate] + ([lesson_name] if lesson_name else []))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to read at-risk students: {str(e)}")
+            return []
+
+    @INSTRUMENTATION.timed
+    def fetch_absentees(self, session_ids):
+        absentees = {session_id: [] for session_id in session_ids}
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                session_ids = list(absentees)
+                for start in range(0, len(session_ids), PARAMETER_CHUNK_SIZE):
+                    chunk = session_ids[start:start + PARAMETER_CHUNK_SIZE]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(f'''
+                        SELECT sub.session_id, st.student_id
+                        FROM submissions sub JOIN students st ON st.id = sub.student_ref
+                        WHERE sub.session_id IN ({placeholders}) AND sub.status <> {STATUS_PRESENT}
+                        ORDER BY sub.session_id, sub.id
+                    ''', chunk)
+                    for session_id, student_id in cursor.fetchall():
+                        absentees[session_id].append(student_id)
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to read absentees: {str(e)}")
+        return absentees
+
+    @INSTRUMENTATION.timed
+    def fetch_attendance_data(self, lesson_name=None):
+        # Integer keys only, so callers can load them straight into arrays:
+        # sessions are (session_id, lesson_id) in date order, cells are (session_id, student_ref, status)
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                lesson_filter = "WHERE l.name = ?" if lesson_name else ""
+                params = [lesson_name] if lesson_name else []
+                cursor.execute(f'''
+                    SELECT se.id, se.lesson_id FROM sessions se JOIN lessons l ON l.id = se.lesson_id
+                    {lesson_filter}
+                    ORDER BY se.lesson_id, se.date, se.period
+                ''', params)
+                sessions = cursor.fetchall()
+                cursor.execute(f'''
+                    SELECT sub.session_id, sub.student_ref, sub.status FROM submissions sub
+                    JOIN sessions se ON se.id = sub.session_id JOIN lessons l ON l.id = se.lesson_id
+                    {lesson_filter}
+                ''', params)
+                cells = cursor.fetchall()
+                cursor.execute('SELECT id, name FROM lessons')
+                lesson_names = dict(cursor.fetchall())
+                cursor.execute('SELECT id, student_id FROM students')
+                student_ids = dict(cursor.fetchall())
+                return sessions, cells, lesson_names, student_ids
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to read attendance data: {str(e)}")
+            return [], [], {}, {}
+
+    @INSTRUMENTATION.timed
+    def fetch_submissions_for_export(self, **filters):
+        try:
+            with self.get_connection() as conn:
+                parts = self.query_records(conn.cursor(), filters)
+                return [row[1:] for row in heapq.merge(*parts)]
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to fetch submissions: {str(e)}")
             return []
 
-    def import_lesson_info(self, file_path, is_db):
+    def iter_submission_chunks(self, chunk_size=5000, **filters):
+        # filters are the record_filter keywords. With a date range the overlapping archived terms are
+        # streamed first, oldest first, then the live database; each part is in submission order.
+        with closing(self.record_schemas(filters.get("start_date"), filters.get("end_date"))) as schemas:
+            for schema in schemas:
+                where, params = self.record_filter(**filters, schema=schema)
+                cursor = self.get_connection().cursor()
+                try:
+                    cursor.execute(RECORD_QUERY.format(schema=schema, where=where), params)
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        yield [row[1:] for row in rows]
+                finally:
+                    cursor.close()
+
+    def current_change_seq(self):
+        # The step of the last committed submission write
+        return int(self.get_meta("submissions_change_seq", 0))
+
+    def get_export_watermark(self, target):
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT last_seq FROM export_watermarks WHERE target = ?', (target,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def save_export_watermark(self, target, last_seq, row_count):
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO export_watermarks (target, last_seq, row_count, exported_at)
+                VALUES (?, ?, ?, ?)
+            ''', (target, last_seq, row_count, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    def clear_export_watermark(self, target):
+        with self.get_connection() as conn:
+            conn.execute('DELETE FROM export_watermarks WHERE target = ?', (target,))
+
+    def record_import_stats(self, rows, started):
+        seconds = max(time.perf_counter() - started, 1e-9)
+        self.last_import_stats = {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds}
+
+    def read_table(self, file_path):
+        # pandas is only needed for whole-file imports, so it is loaded on first use
+        import pandas as pd
+
+        if file_path.lower().endswith(".csv"):
+            return pd.read_csv(file_path, dtype=str, encoding="utf-8-sig")
+        # The Rust-based calamine reader parses large workbooks much faster when installed
+        try:
+            return pd.read_excel(file_path, engine="calamine")
+        except ImportError:
+            return pd.read_excel(file_path)
+
+    def excel_columns_as_rows(self, df, columns, key_columns=(), timestamp_columns=()):
+        # Whole-column conversion; rows with a missing key value fail the import
+        if not all(col in df.columns for col in columns):
+            raise ValueError(f"Missing required columns: {', '.join(columns)}")
+        if len(df) and df[list(key_columns)].isna().any(axis=None):
+            raise ValueError(f"Empty values in {', '.join(key_columns)}")
+        from pandas.api.types import is_datetime64_any_dtype
+
+        converted = []
+        for column in columns:
+            series = df[column]
+            if is_datetime64_any_dtype(series):
+                text = series.dt.strftime("%Y-%m-%d %H:%M:%S" if column in timestamp_columns else "%Y-%m-%d")
+            else:
+                text = series.astype(str)
+            converted.append(text.astype(object).mask(series.isna(), None).tolist())
+        return list(zip(*converted))
+
+    @INSTRUMENTATION.timed(rows=imported_rows)
+    def import_lesson_info(self, file_path, is_db, progress=None):
         try:
+            started = time.perf_counter()
             if is_db:
-                with sqlite3.connect(file_path) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT name, day, period, begin_date, end_date FROM lessons')
-                    rows = cursor.fetchall()
-                for row in rows:
-                    name, day, period, begin_date, end_date = row
-                    begin_date_obj = QDate.fromString(begin_date, "yyyy-MM-dd")
-                    end_date_obj = QDate.fromString(end_date, "yyyy-MM-dd")
-                    with sqlite3.connect(self.db_path) as conn:
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            INSERT OR REPLACE INTO lessons (name, day, period, begin_date, end_date)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (name, day, period, begin_date, end_date))
-                        conn.commit()
-            else:  # Excel
-                df = pd.read_excel(file_path)
-                required_columns = ["name", "day", "period", "begin_date", "end_date"]
-                if not all(col in df.columns for col in required_columns):
-                    return False
-                for _, row in df.iterrows():
-                    name = str(row["name"])
-                    day = str(row["day"])
-                    period = str(row["period"])
-                    begin_date = str(row["begin_date"])
-                    end_date = str(row["end_date"])
-                    with sqlite3.connect(self.db_path) as conn:
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            INSERT OR REPLACE INTO lessons (name, day, period, begin_date, end_date)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (name, day, period, begin_date, end_date))
-                        conn.commit()
+                count = self.import_lessons_from_db(file_path)
+            else:  # Excel or CSV
+                df = self.read_table(file_path)
+                rows = self.excel_columns_as_rows(df, LESSON_COLUMNS, ["name"])
+                with self.get_connection() as conn:
+                    self.executemany_in_chunks(conn.cursor(), LESSON_UPSERT, rows, progress)
+                count = len(rows)
+            self.record_import_stats(count, started)
             return True
+        # A file that fails validation raises ValueError with the reason, for the caller to show
+        except (OperationCancelled, ValueError):
+            raise
         except Exception as e:
             return False
 
-    def import_student_info(self, file_path, is_db, student_ids):
+    @INSTRUMENTATION.timed(rows=imported_rows)
+    def import_student_info(self, file_path, is_db, student_ids, progress=None):
         try:
+            started = time.perf_counter()
             if is_db:
-                with sqlite3.connect(file_path) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT student_id FROM students')
-                    rows = cursor.fetchall()
-                for row in rows:
-                    student_id = row[0]
-                    if student_id not in student_ids:
-                        student_ids.append(student_id)
-            else:  # Excel
-                df = pd.read_excel(file_path)
-                if "student_id" not in df.columns:
-                    return False
-                for _, row in df.iterrows():
-                    student_id = str(row["student_id"])
-                    if student_id not in student_ids:
-                        student_ids.append(student_id)
+                count = self.import_students_from_db(file_path)
+            else:  # Excel or CSV
+                df = self.read_table(file_path)
+                if "lesson" in df.columns:
+                    rows = self.excel_columns_as_rows(df, ["student_id", "lesson"], ["student_id"])
+                else:
+                    rows = [(student_id, None) for (student_id,) in
+                            self.excel_columns_as_rows(df, ["student_id"], ["student_id"])]
+                self.add_students([row[0] for row in rows], progress)
+                self.enroll_student_rows([row for row in rows if row[1] is not None])
+                count = len(rows)
+            student_ids[:] = self.load_roster()
+            self.record_import_stats(count, started)
             return True
+        except (OperationCancelled, ValueError):
+            raise
         except Exception as e:
             return False
 
-    def import_presence_info(self, file_path, is_db):
+    def get_meta(self, key, default=None):
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT value FROM app_meta WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, cursor, key, value):
+        cursor.execute('INSERT OR REPLACE INTO app_meta (key, value) VALUES (?, ?)', (key, value))
+
+    @INSTRUMENTATION.timed
+    def load_roster(self):
+        # self.roster is an ordered set of student IDs: O(1) membership, insertion order for display
         try:
-            if is_db:
-                with sqlite3.connect(file_path) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT date, lesson, day, period, student_id, status FROM submissions')
-                    rows = cursor.fetchall()
-                with sqlite3.connect(self.db_path) as conn:
-                    cursor = conn.cursor()
-                    cursor.executemany('''
-                        INSERT INTO submissions (date, lesson, day, period, student_id, status)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', rows)
-                    conn.commit()
-            else:  # Excel
-                df = pd.read_excel(file_path)
-                required_columns = ["date", "lesson", "day", "period", "student_id", "status"]
-                if not all(col in df.columns for col in required_columns):
+            cursor = self.get_connection().cursor()
+            cursor.execute('SELECT student_id FROM students WHERE in_roster = 1 ORDER BY id')
+            self.roster = dict.fromkeys(row[0] for row in cursor.fetchall())
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to load students: {str(e)}")
+        return list(self.roster)
+
+    def seed_roster(self, student_ids):
+        # Only the first start seeds the roster, so an intentionally emptied roster stays empty
+        if self.get_meta("roster_seeded"):
+            return
+        self.add_students(student_ids)
+        with self.get_connection() as conn:
+            self.set_meta(conn.cursor(), "roster_seeded", "1")
+
+    def has_student(self, student_id):
+        return student_id in self.roster
+
+    @INSTRUMENTATION.timed
+    def add_students(self, student_ids, progress=None):
+        new_ids = [student_id for student_id in dict.fromkeys(student_ids) if student_id not in self.roster]
+        try:
+            with self.get_connection() as conn:
+                self.executemany_in_chunks(conn.cursor(), STUDENT_UPSERT,
+                                           [(student_id,) for student_id in new_ids], progress)
+            self.roster.update(dict.fromkeys(new_ids))
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to add students: {str(e)}")
+        return new_ids
+
+    @INSTRUMENTATION.timed
+    def rename_student(self, old_id, new_id):
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT 1 FROM students WHERE student_id = ?', (new_id,))
+                if cursor.fetchone():
                     return False
-                rows = [(str(row["date"]), str(row["lesson"]), str(row["day"]), str(row["period"]),
-                         str(row["student_id"]), str(row["status"])) for _, row in df.iterrows()]
-                with sqlite3.connect(self.db_path) as conn:
+                cursor.execute('UPDATE students SET student_id = ? WHERE student_id = ?', (new_id, old_id))
+            # Rebuild to keep the roster order
+            self.roster = {new_id if student_id == old_id else student_id: None for student_id in self.roster}
+            return True
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to rename student: {str(e)}")
+            return False
+
+    @INSTRUMENTATION.timed
+    def remove_student(self, student_id):
+        # Attendance history keeps referencing the student; only roster membership is dropped
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    DELETE FROM enrollments
+                    WHERE student_ref = (SELECT id FROM students WHERE student_id = ?)
+                ''', (student_id,))
+                cursor.execute('UPDATE students SET in_roster = 0 WHERE student_id = ?', (student_id,))
+            self.roster.pop(student_id, None)
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to remove student: {str(e)}")
+
+    def enroll_student_rows(self, rows):
+        with self.get_connection() as conn:
+            self.insert_enrollments(conn.cursor(), rows)
+
+    def insert_enrollments(self, cursor, rows):
+        # rows are (student_id, lesson name); lessons are created on first use
+        cursor.executemany('INSERT OR IGNORE INTO lessons (name) VALUES (?)',
+                           [(lesson,) for lesson in dict.fromkeys(row[1] for row in rows)])
+        cursor.executemany('''
+            INSERT OR IGNORE INTO enrollments (lesson_id, student_ref)
+            SELECT l.id, st.id FROM lessons l, students st WHERE l.name = ? AND st.student_id = ?
+        ''', [(lesson, student_id) for student_id, lesson in rows])
+
+    @INSTRUMENTATION.timed
+    def enroll_students(self, lesson_name, student_ids):
+        self.add_students(student_ids)
+        try:
+            self.enroll_student_rows([(student_id, lesson_name) for student_id in student_ids])
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to enroll students: {str(e)}")
+
+    @INSTRUMENTATION.timed
+    def load_enrollment(self, lesson_name):
+        try:
+            cursor = self.get_connection().cursor()
+            cursor.execute('''
+                SELECT st.student_id FROM enrollments e
+                JOIN lessons l ON l.id = e.lesson_id
+                JOIN students st ON st.id = e.student_ref
+                WHERE l.name = ? AND st.in_roster = 1
+                ORDER BY st.id
+            ''', (lesson_name,))
+            return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            self.report_error(f"Failed to load enrollment: {str(e)}")
+            return []
+
+    def import_students_from_db(self, file_path):
+        conn = self.get_connection()
+        self.attach_source(conn, file_path)
+        try:
+            cursor = conn.cursor()
+            self.require_source_columns(cursor, "students", ["student_id"])
+            roster_filter = "AND in_roster = 1" if "in_roster" in self.source_columns(cursor, "students") else ""
+            with conn:
+                cursor.execute(f'''
+                    INSERT INTO students (student_id, in_roster)
+                    SELECT DISTINCT student_id, 1 FROM source.students WHERE student_id IS NOT NULL {roster_filter}
+                    ON CONFLICT (student_id) DO UPDATE SET in_roster = 1
+                ''')
+                return cursor.rowcount
+        finally:
+            self.detach_source(conn)
+
+    @INSTRUMENTATION.timed(rows=imported_rows)
+    def import_presence_info(self, file_path, is_db, progress=None, conflict="skip"):
+        try:
+            started = time.perf_counter()
+            if is_db:
+                count = self.import_presence_from_db(file_path, progress, conflict)
+            else:  # Excel or CSV
+                df = self.read_table(file_path)
+                rows = self.excel_columns_as_rows(df, self.presence_columns(df.columns, conflict),
+                                                  ["date", "lesson", "student_id"], SUBMITTED_AT_COLUMNS)
+                with self.get_connection() as conn:
                     cursor = conn.cursor()
-                    cursor.executemany('''
-                        INSERT INTO submissions (date, lesson, day, period, student_id, status)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', rows)
-                    conn.commit()
+                    self.insert_submission_rows(cursor, rows, progress, conflict)
+                count = len(rows)
+            self.record_import_stats(count, started)
             return True
+        except (OperationCancelled, ValueError):
+            raise
         except Exception as e:
-            return False
\ No newline at end of file
+            return False
+
+    def attach_source(self, conn, file_path):
+        # ATTACH cannot run inside a transaction, so it happens before the import's "with conn:" block
+        if not os.path.isfile(file_path):
+            raise ValueError(f"Source database not found: {file_path}")
+        try:
+            conn.execute('ATTACH DATABASE ? AS source', (file_path,))
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError:
+            raise ValueError(f"Not a SQLite database: {file_path}")
+
+    def detach_source(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute('DETACH DATABASE source')
+
+    def source_columns(self, cursor, table):
+        cursor.execute(f'PRAGMA source.table_info({table})')
+        return {row[1] for row in cursor.fetchall()}
+
+    def require_source_columns(self, cursor, table, columns):
+        missing = [column for column in columns if column not in self.source_columns(cursor, table)]
+        if missing:
+            raise ValueError(f"Source table {table} is missing columns: {', '.join(missing)}")
+
+    def import_lessons_from_db(self, file_path):
+        conn = self.get_connection()
+        self.attach_source(conn, file_path)
+        try:
+            cursor = conn.cursor()
+            self.require_source_columns(cursor, "lessons", LESSON_COLUMNS)
+            with conn:
+                cursor.execute('''
+                    INSERT INTO lessons (name, day, period, begin_date, end_date)
+                    SELECT name, day, period, begin_date, end_date FROM source.lessons WHERE name IS NOT NULL
+                    ON CONFLICT (name) DO UPDATE SET day = excluded.day, period = excluded.period,
+                        begin_date = excluded.begin_date, end_date = excluded.end_date
+                ''')
+                return cursor.rowcount
+        finally:
+            self.detach_source(conn)
+
+    def import_presence_from_db(self, file_path, progress=None, conflict="skip"):
+        # Rows move between the two files inside SQLite; rowid ranges keep progress and cancellation responsive
+        conn = self.get_connection()
+        self.attach_source(conn, file_path)
+        try:
+            cursor = conn.cursor()
+            legacy = self.has_legacy_submissions(cursor, "source")
+            has_timestamps = not legacy and "submitted_at" in self.source_columns(cursor, "submissions")
+            if conflict == "newest" and not has_timestamps:
+                raise ValueError("Keeping the newest submission needs a source database with submitted_at times")
+            if legacy:
+                self.require_source_columns(cursor, "submissions", PRESENCE_COLUMNS)
+                select = '''
+                    SELECT date, lesson, day, period, student_id, status, NULL AS submitted_at FROM source.submissions
+                    WHERE rowid > {low} AND rowid <= {high} ORDER BY rowid
+                '''
+            else:
+                self.require_source_columns(cursor, "submissions", ["session_id", "student_ref", "status"])
+                self.require_source_columns(cursor, "sessions", ["id", "lesson_id", "date", "day", "period"])
+                self.require_source_columns(cursor, "lessons", ["id", "name"])
+                self.require_source_columns(cursor, "students", ["id", "student_id"])
+                select = f'''
+                    SELECT se.date AS date, l.name AS lesson, se.day AS day, se.period AS period,
+                           st.student_id AS student_id,
+                           CASE sub.status WHEN {STATUS_PRESENT} THEN 'Present' ELSE 'Absent' END AS status,
+                           {"sub.submitted_at" if has_timestamps else "NULL"} AS submitted_at
+                    FROM source.submissions sub
+                    JOIN source.sessions se ON se.id = sub.session_id
+                    JOIN source.lessons l ON l.id = se.lesson_id
+                    JOIN source.students st ON st.id = sub.student_ref
+                    WHERE sub.rowid > {{low}} AND sub.rowid <= {{high}} ORDER BY sub.rowid
+                '''
+            cursor.execute('SELECT MIN(rowid), MAX(rowid) FROM source.submissions')
+            low, high = cursor.fetchone()
+            if low is None:
+                return 0
+            self.prepare_staging(cursor)
+            with conn:
+                staged = 0
+                for start in range(low - 1, high, ATTACH_CHUNK_SIZE):
+                    cursor.execute(STAGING_INSERT_SELECT.format(
+                        select=select.format(low=start, high=start + ATTACH_CHUNK_SIZE)))
+                    staged += cursor.rowcount
+                    if progress:
+                        progress(staged)
+                self.merge_staging(cursor, conflict)
+            return staged
+        finally:
+            self.detach_source(conn)
+
+    def get_import_checkpoint(self, file_path, import_type):
+        source_path = os.path.abspath(file_path)
+        stat = os.stat(source_path)
+        cursor = self.get_connection().cursor()
+        cursor.execute('''
+            SELECT rows_done FROM import_checkpoints
+            WHERE source_path = ? AND import_type = ? AND file_size = ? AND file_mtime = ?
+        ''', (source_path, import_type, stat.st_size, stat.st_mtime))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def save_import_checkpoint(self, cursor, file_path, import_type, rows_done):
+        source_path = os.path.abspath(file_path)
+        stat = os.stat(source_path)
+        cursor.execute('''
+            INSERT OR REPLACE INTO import_checkpoints (source_path, import_type, file_size, file_mtime, rows_done)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (source_path, import_type, stat.st_size, stat.st_mtime, rows_done))
+
+    def clear_import_checkpoint(self, file_path, import_type):
+        with self.get_connection() as conn:
+            conn.execute('DELETE FROM import_checkpoints WHERE source_path = ? AND import_type = ?',
+                         (os.path.abspath(file_path), import_type))
+
+    @INSTRUMENTATION.timed
+    def import_file_streaming(self, file_path, import_type, batch_size=5000, resume=True, progress=None,
+                              conflict="skip"):
+        # Each batch commits together with its checkpoint, so a crash resumes after the last full batch
+        started = time.perf_counter()
+        if import_type == "lesson":
+            columns, key_columns = LESSON_COLUMNS, ["name"]
+        elif import_type not in ("student", "presence"):
+            raise ValueError(f"Unsupported streaming import type: {import_type}")
+
+        skip_rows = self.get_import_checkpoint(file_path, import_type) if resume else 0
+        imported = 0
+        reader = BatchReader(file_path, batch_size)
+        if import_type == "student":
+            # A roster with a lesson column enrolls each student too, as the whole-file import does
+            columns = ["student_id", "lesson"] if "lesson" in reader.header() else ["student_id"]
+            key_columns = ["student_id"]
+        elif import_type == "presence":
+            columns = self.presence_columns(reader.header(), conflict)
+            key_columns = ["date", "lesson", "student_id"]
+        for rows_done, rows in reader.iter_batches(columns, key_columns, skip_rows, SUBMITTED_AT_COLUMNS):
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                if import_type == "lesson":
+                    cursor.executemany(LESSON_UPSERT, rows)
+                elif import_type == "student":
+                    cursor.executemany(STUDENT_UPSERT, [row[:1] for row in rows])
+                    self.insert_enrollments(cursor, [row for row in rows if len(row) > 1 and row[1] is not None])
+                else:
+                    self.insert_submission_rows(cursor, rows, conflict=conflict)
+                self.save_import_checkpoint(cursor, file_path, import_type, rows_done)
+            imported += len(rows)
+            if progress:
+                progress(rows_done)
+        self.clear_import_checkpoint(file_path, import_type)
+        if import_type == "student":
+            self.load_roster()
+        self.record_import_stats(imported, started)
+        return imported
\ No newline at end of file
@@ -0,0 +1,146 @@
+import csv
+import os
+import time
+
+EXPORT_HEADERS = ["Date", "Lesson", "Day", "Period", "Student ID", "Status"]
+
+
+class ExportManager:
+    FORMATS = {".xlsx": "excel", ".csv": "csv", ".parquet": "parquet"}
+
+    def __init__(self, db_manager, chunk_size=5000):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+
+    def detect_format(self, file_path):
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {extension or 'no extension'}")
+        return self.FORMATS[extension]
+
+    def export(self, file_path, progress=None, filters=None):
+        # Rows are streamed from the cursor so memory stays bounded by chunk_size;
+        # filters are DatabaseManager.record_filter keywords
+        export_format = self.detect_format(file_path)
+        chunks = self.db_manager.iter_submission_chunks(self.chunk_size, **(filters or {}))
+        return self.write_file(file_path, export_format, self.track_progress(chunks, progress))
+
+    def replaces_existing_file(self, file_path, target=None):
+        # True when the first incremental run for target would replace a .csv file that already exists
+        target = target or os.path.abspath(file_path)
+        return (self.detect_format(file_path) == "csv" and os.path.exists(file_path)
+                and not self.db_manager.get_export_watermark(target))
+
+    def export_incremental(self, file_path, progress=None, filters=None, target=None, overwrite=False):
+        # Writes only the submissions added or changed since the last run for target (default: file_path),
+        # so the cost follows the new rows rather than the whole history. A corrected submission is written
+        # again, after the row it replaces. A .csv file is appended to in place; other formats get a
+        # timestamped delta file next to file_path. Returns (path written or None, rows).
+        # The watermark is saved after the file is written, so a crash between the two repeats those rows
+        # on the next run rather than losing them.
+        export_format = self.detect_format(file_path)
+        if not overwrite and self.replaces_existing_file(file_path, target):
+            raise FileExistsError(f"{file_path} already exists and has no export watermark")
+        target = target or os.path.abspath(file_path)
+        after_seq = self.db_manager.get_export_watermark(target)
+        # Fixed up front, so rows saved while the export runs are left for the next run
+        through_seq = self.db_manager.current_change_seq()
+        if through_seq <= after_seq:
+            return None, 0
+        chunks = self.db_manager.iter_submission_chunks(self.chunk_size, after_seq=after_seq,
+                                                        through_seq=through_seq, **(filters or {}))
+        chunks = self.track_progress(chunks, progress)
+        if export_format == "csv":
+            # The first run for a target writes the full history, replacing whatever the file held
+            output_path = file_path
+            count = self.append_csv(file_path, chunks) if after_seq else self.write_file(file_path, "csv", chunks)
+        else:
+            stem, extension = os.path.splitext(file_path)
+            output_path = f"{stem}_{time.strftime('%Y%m%d_%H%M%S')}{extension}"
+            count = self.write_file(output_path, export_format, chunks)
+        self.db_manager.save_export_watermark(target, through_seq, count)
+        return output_path, count
+
+    def write_file(self, file_path, export_format, chunks):
+        # Written next to file_path and renamed over it when complete, so a failure or cancellation
+        # leaves any existing file untouched and never a truncated one
+        writer = getattr(self, f"write_{export_format}")
+        stem, extension = os.path.splitext(file_path)
+        partial_path = f"{stem}.partial{extension}"
+        try:
+            count = writer(partial_path, chunks)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        os.replace(partial_path, file_path)
+        return count
+
+    def track_progress(self, chunks, progress):
+        exported = 0
+        for rows in chunks:
+            yield rows
+            exported += len(rows)
+            if progress:
+                progress(exported)
+
+    def write_csv(self, file_path, chunks):
+        count = 0
+        with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_HEADERS)
+            for rows in chunks:
+                writer.writerows(rows)
+                count += len(rows)
+        return count
+
+    def append_csv(self, file_path, chunks):
+        # A failed append is cut back to the original size, so the file never holds a partial batch
+        original_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        count = 0
+        try:
+            with open(file_path, "a", newline="", encoding="utf-8-sig" if not original_size else "utf-8") as f:
+                writer = csv.writer(f)
+                if not original_size:
+                    writer.writerow(EXPORT_HEADERS)
+                for rows in chunks:
+                    writer.writerows(rows)
+                    count += len(rows)
+        except BaseException:
+            if original_size:
+                with open(file_path, "r+b") as f:
+                    f.truncate(original_size)
+            elif os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        return count
+
+    def write_excel(self, file_path, chunks):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Submissions")
+        sheet.append(EXPORT_HEADERS)
+        count = 0
+        for rows in chunks:
+            for row in rows:
+                sheet.append(row)
+            count += len(rows)
+        workbook.save(file_path)
+        return count
+
+    def write_parquet(self, file_path, chunks):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires the pyarrow package.")
+
+        schema = pa.schema([(name, pa.string()) for name in EXPORT_HEADERS])
+        count = 0
+        with pq.ParquetWriter(file_path, schema, compression="zstd") as writer:
+            for rows in chunks:
+                columns = [list(column) for column in zip(*rows)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                count += len(rows)
+        return count
\ No newline at end of file
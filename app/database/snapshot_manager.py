@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+import time
+
+SNAPSHOT_VERSION = 1
+# Column name -> dtype; text columns are stored as integer codes into the manifest's dictionaries
+SNAPSHOT_COLUMNS = {
+    "date": "datetime64[D]",
+    "lesson": "int32",
+    "day": "int16",
+    "period": "int16",
+    "student_id": "int32",
+    "status": "int8"
+}
+DICTIONARY_COLUMNS = ["lesson", "day", "period", "student_id"]
+# Dates that SQLite cannot parse become NaT
+DATE_DAYS = "COALESCE(CAST(julianday(se.date) - 2440587.5 AS INTEGER), -9223372036854775808)"
+
+
+class SnapshotManager:
+    # A snapshot is a directory of .npy files, one per column, plus manifest.json with the dictionaries.
+    # load_arrays memory-maps the files, so a reload costs the page-ins rather than a row-by-row fetch;
+    # load_dataframe builds a pandas frame on top, which copies the columns into memory.
+    # A path ending in .parquet writes a zstd-compressed, dictionary-encoded Parquet file instead.
+    def __init__(self, db_manager, chunk_size=100000):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+
+    def build_dictionaries(self, cursor):
+        # Codes are assigned in temp tables so the export query can return integers directly
+        # NULL values get no code; rows referring to them are stored as -1 (missing)
+        queries = {
+            "lesson": 'SELECT id, name FROM lessons WHERE name IS NOT NULL ORDER BY id',
+            "day": 'SELECT DISTINCT NULL, day FROM sessions WHERE day IS NOT NULL ORDER BY day',
+            "period": 'SELECT DISTINCT NULL, period FROM sessions WHERE period IS NOT NULL ORDER BY period',
+            "student_id": 'SELECT id, student_id FROM students ORDER BY id'
+        }
+        dictionaries = {}
+        for column, query in queries.items():
+            cursor.execute(f'DROP TABLE IF EXISTS temp.snapshot_{column}')
+            cursor.execute(f'CREATE TEMP TABLE snapshot_{column} (code INTEGER PRIMARY KEY, ref INTEGER, value TEXT)')
+            rows = cursor.execute(query).fetchall()
+            cursor.executemany(f'INSERT INTO temp.snapshot_{column} (code, ref, value) VALUES (?, ?, ?)',
+                               [(code, ref, value) for code, (ref, value) in enumerate(rows)])
+            dictionaries[column] = [value for _, value in rows]
+        return dictionaries
+
+    def iter_coded_chunks(self, cursor):
+        cursor.execute(f'''
+            SELECT {DATE_DAYS}, COALESCE(l.code, -1), COALESCE(d.code, -1), COALESCE(p.code, -1), st.code,
+                   sub.status
+            FROM submissions sub
+            JOIN sessions se ON se.id = sub.session_id
+            LEFT JOIN temp.snapshot_lesson l ON l.ref = se.lesson_id
+            LEFT JOIN temp.snapshot_day d ON d.value = se.day
+            LEFT JOIN temp.snapshot_period p ON p.value = se.period
+            JOIN temp.snapshot_student_id st ON st.ref = sub.student_ref
+            ORDER BY sub.id
+        ''')
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def write(self, path, progress=None):
+        import numpy as np
+
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        try:
+            # One read transaction, so the count, dictionaries and rows all come from the same state
+            cursor.execute('BEGIN')
+            total = cursor.execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
+            dictionaries = self.build_dictionaries(cursor)
+            chunks = self.iter_coded_chunks(cursor)
+            if path.lower().endswith(".parquet"):
+                return self.write_parquet(path, chunks, dictionaries, progress)
+            return self.write_arrays(path, total, chunks, dictionaries, progress, np)
+        finally:
+            conn.rollback()
+
+    def write_arrays(self, path, total, chunks, dictionaries, progress, np):
+        # Written next to the target and renamed at the end, so a failed run never leaves a partial snapshot
+        work_path = f"{path}.partial"
+        shutil.rmtree(work_path, ignore_errors=True)
+        os.makedirs(work_path)
+        try:
+            columns = {name: np.lib.format.open_memmap(os.path.join(work_path, f"{name}.npy"), mode="w+",
+                                                       dtype=dtype, shape=(total,))
+                       for name, dtype in SNAPSHOT_COLUMNS.items()}
+            written = 0
+            for rows in chunks:
+                block = np.array(rows, dtype=np.int64)
+                for position, (name, column) in enumerate(columns.items()):
+                    column[written:written + len(rows)] = block[:, position].astype(column.dtype)
+                written += len(rows)
+                if progress:
+                    progress(written)
+            for column in columns.values():
+                column.flush()
+            del columns
+            manifest = {"version": SNAPSHOT_VERSION, "rows": written, "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "columns": SNAPSHOT_COLUMNS, "dictionaries": dictionaries}
+            with open(os.path.join(work_path, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(work_path, path)
+            return written
+        except BaseException:
+            shutil.rmtree(work_path, ignore_errors=True)
+            raise
+
+    def write_parquet(self, path, chunks, dictionaries, progress):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet snapshots require the pyarrow package.")
+
+        values = {name: pa.array(dictionaries[name], pa.string()) for name in DICTIONARY_COLUMNS}
+        schema = pa.schema([("date", pa.date32())] +
+                           [(name, pa.dictionary(pa.int32(), pa.string())) for name in DICTIONARY_COLUMNS] +
+                           [("status", pa.int8())])
+        work_path = f"{path}.partial"
+        written = 0
+        try:
+            with pq.ParquetWriter(work_path, schema, compression="zstd") as writer:
+                for rows in chunks:
+                    date, lesson, day, period, student_id, status = (list(column) for column in zip(*rows))
+                    dates = pa.array([None if days < -10 ** 9 else days for days in date], pa.int32())
+                    arrays = [dates.cast(pa.date32())]
+                    for name, codes in zip(DICTIONARY_COLUMNS, (lesson, day, period, student_id)):
+                        indices = pa.array([None if code < 0 else code for code in codes], pa.int32())
+                        arrays.append(pa.DictionaryArray.from_arrays(indices, values[name]))
+                    arrays.append(pa.array(status, pa.int8()))
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                    written += len(rows)
+                    if progress:
+                        progress(written)
+            os.replace(work_path, path)
+            return written
+        except BaseException:
+            if os.path.exists(work_path):
+                os.remove(work_path)
+            raise
+
+    def load_arrays(self, path):
+        # Returns (columns, dictionaries); the columns are read-only memory maps of the .npy files
+        import numpy as np
+
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in manifest["columns"]}
+        return columns, manifest["dictionaries"]
+
+    def load_dataframe(self, path):
+        # Materializes the snapshot: pandas copies every column, so use load_arrays to stay on the memory maps.
+        # Text columns become Categoricals over the stored codes rather than strings.
+        import pandas as pd
+
+        if path.lower().endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            return pq.read_table(path, memory_map=True).to_pandas(date_as_object=False)
+        columns, dictionaries = self.load_arrays(path)
+        data = {}
+        for name, column in columns.items():
+            if name in dictionaries:
+                data[name] = pd.Categorical.from_codes(column, categories=pd.Index(dictionaries[name]),
+                                                       validate=False)
+            else:
+                data[name] = column
+        return pd.DataFrame(data, copy=False)
\ No newline at end of file
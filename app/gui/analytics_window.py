@@ -0,0 +1,57 @@
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QTabWidget, QTableWidget, QTableWidgetItem, \
+    QAbstractItemView
+from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt
+
+ALERT_COLOR = QColor(255, 220, 220)
+
+
+class AnalyticsWindow(QMainWindow):
+    LESSON_HEADERS = ["Student ID", "Lesson", "Sessions", "Present", "Attendance", "Longest Absence Streak",
+                      "Current Absence Streak", "Rank", "Alert"]
+    STUDENT_HEADERS = ["Student ID", "Sessions", "Present", "Attendance", "Rank", "Alert"]
+
+    def __init__(self, lesson_rows, student_rows, min_rate, streak_alert, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Attendance Analytics")
+        self.setGeometry(150, 150, 800, 500)
+
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout()
+        main_widget.setLayout(layout)
+
+        alerts = sum(1 for row in student_rows if row[-1])
+        layout.addWidget(QLabel(f"Alerts: attendance below {min_rate:.0%} or {streak_alert}+ consecutive absences. "
+                                f"{alerts} of {len(student_rows)} students below the rate overall."))
+
+        tabs = QTabWidget()
+        tabs.addTab(self.build_table(self.STUDENT_HEADERS, student_rows, rate_column=3), "By Student")
+        tabs.addTab(self.build_table(self.LESSON_HEADERS, lesson_rows, rate_column=4), "By Lesson")
+        layout.addWidget(tabs)
+
+    def build_table(self, headers, rows, rate_column):
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setDefaultSectionSize(22)
+        for row, values in enumerate(rows):
+            alert = values[-1]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem()
+                if column == rate_column:
+                    item.setText(f"{value:.0%}")
+                    item.setData(Qt.ItemDataRole.UserRole, value)
+                elif column == len(values) - 1:
+                    item.setText("Yes" if value else "")
+                elif isinstance(value, int):
+                    # Numeric data so the columns sort by value rather than text
+                    item.setData(Qt.ItemDataRole.DisplayRole, value)
+                else:
+                    item.setText(str(value))
+                if alert:
+                    item.setBackground(ALERT_COLOR)
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+        return table
\ No newline at end of file
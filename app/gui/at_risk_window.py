@@ -0,0 +1,28 @@
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, \
+    QAbstractItemView
+
+
+class AtRiskWindow(QMainWindow):
+    HEADERS = ["Student ID", "Lesson", "Present", "Absent", "Attendance"]
+
+    def __init__(self, rows, min_rate, lesson_name=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("At-Risk Students")
+        self.setGeometry(150, 150, 600, 400)
+
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout()
+        main_widget.setLayout(layout)
+
+        scope = f" in {lesson_name}" if lesson_name else ""
+        layout.addWidget(QLabel(f"{len(rows)} students below {min_rate:.0%} attendance{scope}"))
+
+        table = QTableWidget(len(rows), len(self.HEADERS))
+        table.setHorizontalHeaderLabels(self.HEADERS)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setDefaultSectionSize(22)
+        for row, (student_id, lesson, present, absent, rate) in enumerate(rows):
+            for column, value in enumerate((student_id, lesson, present, absent, f"{rate:.0%}")):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        layout.addWidget(table)
\ No newline at end of file
@@ -0,0 +1,42 @@
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QTableWidget, \
+    QTableWidgetItem, QAbstractItemView
+from PyQt6.QtCore import Qt, pyqtSignal
+
+
+class CalendarWindow(QMainWindow):
+    HEADERS = ["Date", "Lesson", "Period"]
+    # Double-clicking a lesson selects it in the main window
+    lesson_selected = pyqtSignal(str)
+
+    def __init__(self, todays_lessons, missing_rows, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Lesson Calendar")
+        self.setGeometry(150, 150, 500, 500)
+
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout()
+        main_widget.setLayout(layout)
+
+        layout.addWidget(QLabel(f"Today's lessons: {len(todays_lessons)}"))
+        lesson_list = QListWidget()
+        lesson_list.setMaximumHeight(120)
+        for lesson, period in todays_lessons:
+            item = QListWidgetItem(f"{period}  {lesson}")
+            item.setData(Qt.ItemDataRole.UserRole, lesson)
+            lesson_list.addItem(item)
+        lesson_list.itemDoubleClicked.connect(
+            lambda item: self.lesson_selected.emit(item.data(Qt.ItemDataRole.UserRole)))
+        layout.addWidget(lesson_list)
+
+        layout.addWidget(QLabel(f"{len(missing_rows)} scheduled sessions before today have no submissions"))
+        table = QTableWidget(len(missing_rows), len(self.HEADERS))
+        table.setHorizontalHeaderLabels(self.HEADERS)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setDefaultSectionSize(22)
+        for row, values in enumerate(missing_rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        table.cellDoubleClicked.connect(lambda row, column: self.lesson_selected.emit(table.item(row, 1).text()))
+        layout.addWidget(table)
\ No newline at end of file
@@ -25,7 +25,7 @@ class ImportDetailsWindow(QMainWindow):
         details = {
             "lesson_info": """
 Lesson Info Import Details:
-- File Format: SQLite Database (.db) or Excel (.xlsx)
+- File Format: SQLite Database (.db), Excel (.xlsx) or CSV (.csv)
 - Required Columns:
   - name: Unique lesson name (text, e.g., "基礎セミナー")
   - day: Day of the week (text, e.g., "月曜日")
@@ -33,23 +33,27 @@ Lesson Info Import Details:
   - begin_date: Lesson start date (yyyy-MM-dd, e.g., "2025-04-01")
   - end_date: Lesson end date (yyyy-MM-dd, e.g., "2025-07-31")
 - Notes:
-  - For Excel, columns must match exactly (case-sensitive).
+  - For Excel and CSV, columns must match exactly (case-sensitive).
+  - CSV files and large workbooks are imported in batches; an interrupted import can be resumed.
   - For DB, the lessons table must have the same schema as the app's database.
   - Duplicate lesson names will be skipped or updated if they match an existing entry.
 """,
             "student_info": """
 Student Info Import Details:
-- File Format: SQLite Database (.db) or Excel (.xlsx)
+- File Format: SQLite Database (.db), Excel (.xlsx) or CSV (.csv)
 - Required Column:
   - student_id: Unique student identifier (text, e.g., "NUS:022500203")
+- Optional Column:
+  - lesson: Lesson name to enroll the student in (Excel and CSV only)
 - Notes:
-  - For Excel, ensure a single column named "student_id".
+  - For Excel and CSV, ensure a column named "student_id".
   - For DB, provide a table named "students" with a "student_id" column.
   - Duplicate IDs will be skipped to avoid conflicts.
+  - Imported students are saved to the roster and kept after restarting.
 """,
             "presence_info": """
 Presence Info Import Details:
-- File Format: SQLite Database (.db) or Excel (.xlsx)
+- File Format: SQLite Database (.db), Excel (.xlsx) or CSV (.csv)
 - Required Columns:
   - date: Submission date (yyyy-MM-dd, e.g., "2025-04-29")
   - lesson: Lesson name (text, e.g., "基礎セミナー")
@@ -58,9 +62,12 @@ Presence Info Import Details:
   - student_id: Student identifier (text, e.g., "NUS:022500203")
   - status: Presence status (text, "Present" or "Absent")
 - Notes:
-  - For Excel, columns must match exactly (case-sensitive).
-  - For DB, the submissions table must have the same schema as the app's database.
+  - For Excel and CSV, columns must match exactly (case-sensitive).
+  - CSV files and large workbooks are imported in batches; an interrupted import can be resumed.
+  - For DB, the file may use the app's current schema or the older flat submissions table.
   - Ensure lesson and student IDs exist in the app before importing.
+  - Each student has at most one record per date, lesson and period. Existing records are
+    skipped, overwritten, or replaced only by newer submissions, depending on the chosen mode.
 """
         }
         return details.get(self.details_key, "No details available.")
\ No newline at end of file
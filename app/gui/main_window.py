@@ -1,15 +1,27 @@
 import os
+import time
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QComboBox, QTextEdit, QMenuBar, QMessageBox, QFileDialog, \
-    QInputDialog
-from PyQt6.QtCore import QDate
-import pandas as pd
+    QInputDialog, QProgressDialog
+from PyQt6.QtCore import QDate, Qt
 from ..config.config_manager import ConfigManager
+from ..database.calendar_manager import CalendarManager
 from ..database.db_manager import DatabaseManager
-from .records_window import RecordsWindow
-from .lesson_edit_window import LessonEditWindow
-from .students_edit_window import StudentsEditWindow
-from .submission_window import SubmissionWindow
-from .import_details_window import ImportDetailsWindow
+from ..utils.instrumentation import INSTRUMENTATION
+from ..utils.startup_timer import STARTUP_TIMER
+from .task_runner import TaskRunner
+
+DEFAULT_STUDENT_IDS = [
+    "NUS:022500203", "NUS:022500410", "NUS:022500445", "NUS:032500107",
+    "NUS:032500121", "NUS:042500444", "NUS:042500832", "NUS:042501247",
+    "NUS:062300424", "NUS:062500293", "NUS:062500383", "NUS:062500408",
+    "NUS:062501011", "NUS:7125W4015"
+]
+
+CONFLICT_CHOICES = {
+    "Skip (keep existing record)": "skip",
+    "Overwrite existing record": "overwrite",
+    "Newest submission wins (file needs a submitted_at column)": "newest"
+}
 
 
 class AbsenceWindow(QMainWindow):
@@ -22,16 +34,24 @@ class AbsenceWindow(QMainWindow):
         os.makedirs(self.save_dir, exist_ok=True)
 
         self.config_manager = ConfigManager(os.path.join(self.save_dir, "config.json"))
-        self.db_manager = DatabaseManager(os.path.join(self.save_dir, "submission_records.db"))
-
-        self.student_ids = [
-            "NUS:022500203", "NUS:022500410", "NUS:022500445", "NUS:032500107",
-            "NUS:032500121", "NUS:042500444", "NUS:042500832", "NUS:042501247",
-            "NUS:062300424", "NUS:062500293", "NUS:062500383", "NUS:062500408",
-            "NUS:062501011", "NUS:7125W4015"
-        ]
-
-        self.lessons = self.db_manager.load_lessons()
+        STARTUP_TIMER.mark("load config")
+        INSTRUMENTATION.configure(self.config_manager.get_instrumentation_enabled(),
+                                  os.path.join(self.save_dir, "instrumentation.log"),
+                                  self.config_manager.get_slow_operation_threshold_ms())
+        self.db_manager = DatabaseManager(os.path.join(self.save_dir, "submission_records.db"),
+                                          self.config_manager.get_database_pragmas())
+        self.task_runner = TaskRunner(self.db_manager.close_thread_connection, self)
+
+        self.db_manager.seed_roster(DEFAULT_STUDENT_IDS)
+        self.student_ids = self.db_manager.load_roster()
+        STARTUP_TIMER.mark("open database")
+
+        # The lessons revision this window last read, so apply_lesson_changes only touches what moved since
+        self.lessons_revision, lessons, lesson_names = self.db_manager.lesson_changes_since(None)
+        self.lessons = {lesson["name"]: lesson for lesson in lessons.values()}
+        self.lesson_names = lesson_names or {}
+        self.calendar_manager = CalendarManager(self.db_manager)
+        STARTUP_TIMER.mark("load lessons")
         self.present_students = set()
         self.current_lesson = None
 
@@ -51,6 +71,16 @@ class AbsenceWindow(QMainWindow):
         self.info_display.setReadOnly(True)
         self.info_display.setFixedHeight(100)
         layout.addWidget(self.info_display)
+        self.select_current_lesson()
+        STARTUP_TIMER.mark("build main window")
+
+    def closeEvent(self, event):
+        try:
+            self.task_runner.wait_for_done()
+            self.db_manager.close()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to close database: {str(e)}")
+        super().closeEvent(event)
 
     def setup_menu_bar(self):
         try:
@@ -58,9 +88,13 @@ class AbsenceWindow(QMainWindow):
 
             file_menu = menu_bar.addMenu("File")
             export_action = file_menu.addAction("Export")
-            export_action.triggered.connect(self.export_to_excel)
+            export_action.triggered.connect(lambda: self.export_to_excel())
+            incremental_export_action = file_menu.addAction("Export New Records")
+            incremental_export_action.triggered.connect(self.export_new_records)
             import_action = file_menu.addAction("Import")
             import_action.triggered.connect(self.import_data)
+            archive_action = file_menu.addAction("Archive Closed Terms")
+            archive_action.triggered.connect(self.archive_closed_terms)
             setting_action = file_menu.addAction("Setting")
             setting_action.triggered.connect(
                 lambda: QMessageBox.information(self, "Setting", "Settings not implemented."))
@@ -78,6 +112,16 @@ class AbsenceWindow(QMainWindow):
             view_menu = menu_bar.addMenu("View")
             records_action = view_menu.addAction("View Records")
             records_action.triggered.connect(self.view_records)
+            analytics_action = view_menu.addAction("Attendance Analytics")
+            analytics_action.triggered.connect(self.view_analytics)
+            at_risk_action = view_menu.addAction("At-Risk Students")
+            at_risk_action.triggered.connect(self.view_at_risk_students)
+            calendar_action = view_menu.addAction("Today's Lessons and Missing Submissions")
+            calendar_action.triggered.connect(self.view_lesson_calendar)
+            check_summaries_action = view_menu.addAction("Check Attendance Summaries")
+            check_summaries_action.triggered.connect(self.check_summaries)
+            stats_action = view_menu.addAction("Performance Stats")
+            stats_action.triggered.connect(self.view_performance_stats)
 
             help_menu = menu_bar.addMenu("Help")
             about_action = help_menu.addAction("About")
@@ -96,7 +140,8 @@ class AbsenceWindow(QMainWindow):
 
     def show_requirements(self):
         try:
-            requirements = "Required Libraries:\n- PyQt6\n- pandas\n- sqlite3 (built-in)\n- json (built-in)"
+            requirements = ("Required Libraries:\n- PyQt6\n- pandas\n- numpy\n- openpyxl\n- sqlite3 (built-in)\n- json (built-in)\n"
+                            "Optional Libraries:\n- pyarrow (Parquet export)\n- python-calamine (faster Excel import)")
             QMessageBox.information(self, "Requirements", requirements)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to show requirements: {str(e)}")
@@ -105,8 +150,41 @@ class AbsenceWindow(QMainWindow):
         try:
             self.lesson_combo.clear()
             self.lesson_combo.addItem("Select a Lesson")
-            for lesson_name in self.lessons.keys():
-                self.lesson_combo.addItem(lesson_name)
+            self.lesson_combo.addItems(list(self.lessons.keys()))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to update lesson combo: {str(e)}")
+
+    def select_current_lesson(self):
+        # Preselects the lesson running now (or next today) from the lesson calendar
+        try:
+            lesson_name = self.calendar_manager.current_lesson(
+                period_start_times=self.config_manager.get_period_start_times())
+            if lesson_name in self.lessons:
+                self.lesson_combo.setCurrentText(lesson_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to select the current lesson: {str(e)}")
+
+    def apply_lesson_changes(self):
+        # Only lessons changed since this window's revision touch the combo box
+        try:
+            self.lessons_revision, changed, names = self.db_manager.lesson_changes_since(self.lessons_revision)
+            if names is None:
+                return
+            for lesson_id in [lesson_id for lesson_id in self.lesson_names if lesson_id not in names]:
+                lesson_name = self.lesson_names.pop(lesson_id)
+                self.lessons.pop(lesson_name, None)
+                self.lesson_combo.removeItem(self.lesson_combo.findText(lesson_name))
+            new_names = []
+            for lesson_id, lesson in changed.items():
+                previous_name = self.lesson_names.get(lesson_id)
+                if previous_name is None:
+                    new_names.append(lesson["name"])
+                elif previous_name != lesson["name"]:
+                    self.lessons.pop(previous_name, None)
+                    self.lesson_combo.setItemText(self.lesson_combo.findText(previous_name), lesson["name"])
+                self.lesson_names[lesson_id] = lesson["name"]
+                self.lessons[lesson["name"]] = lesson
+            self.lesson_combo.addItems(new_names)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to update lesson combo: {str(e)}")
 
@@ -120,7 +198,7 @@ class AbsenceWindow(QMainWindow):
 
             self.current_lesson = lesson_name
             lesson_data = self.lessons.get(lesson_name, {})
-            student_count = len(self.student_ids)
+            student_count = len(self.db_manager.load_enrollment(lesson_name) or self.student_ids)
             display_text = (f"Lesson: {lesson_data.get('name', '')}\n"
                             f"Day: {lesson_data.get('day', '')}\n"
                             f"Period: {lesson_data.get('period', '')}\n"
@@ -135,6 +213,8 @@ class AbsenceWindow(QMainWindow):
             lesson_data = self.lessons.get(lesson_name, {"name": "", "day": "月曜日", "period": "",
                                                          "begin_date": QDate.currentDate(),
                                                          "end_date": QDate.currentDate()})
+            from .lesson_edit_window import LessonEditWindow
+
             lesson_window = LessonEditWindow(lesson_data, self.db_manager, self)
             lesson_window.show()
             self.lesson_window = lesson_window
@@ -143,7 +223,9 @@ class AbsenceWindow(QMainWindow):
 
     def open_students_edit(self):
         try:
-            students_window = StudentsEditWindow(self.student_ids, self)
+            from .students_edit_window import StudentsEditWindow
+
+            students_window = StudentsEditWindow(self.student_ids, self.db_manager, self)
             students_window.show()
             self.students_window = students_window
         except Exception as e:
@@ -158,7 +240,11 @@ class AbsenceWindow(QMainWindow):
             lesson_data = self.lessons.get(lesson_name, {"name": "", "day": "月曜日", "period": "",
                                                          "begin_date": QDate.currentDate(),
                                                          "end_date": QDate.currentDate()})
-            submission_window = SubmissionWindow(self.student_ids, lesson_data, self.present_students, self.db_manager,
+            # Lessons with an enrollment list only show their enrolled students
+            student_ids = self.db_manager.load_enrollment(lesson_name) or self.student_ids
+            from .submission_window import SubmissionWindow
+
+            submission_window = SubmissionWindow(student_ids, lesson_data, self.present_students, self.db_manager,
                                                  self)
             submission_window.show()
             self.submission_window = submission_window
@@ -167,63 +253,226 @@ class AbsenceWindow(QMainWindow):
 
     def view_records(self):
         try:
-            records = self.db_manager.fetch_records()
-            if not records:
+            from .records_model import RecordsTableModel
+
+            def load_first_page(progress):
+                total = self.db_manager.count_sessions()
+                return total, self.db_manager.fetch_session_summary(RecordsTableModel.PAGE_SIZE) if total else []
+
+            self.run_task("Loading records", load_first_page, self.show_records_window)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to view records: {str(e)}")
+
+    def show_records_window(self, preload):
+        try:
+            if not preload[0]:
                 QMessageBox.information(self, "No Records", "No submission records found.")
                 return
 
-            submissions = {}
-            for record in records:
-                date, lesson, day, period, student_id, status = record
-                key = (date, lesson, day, period)
-                if key not in submissions:
-                    submissions[key] = {"present": [], "absent": []}
-                if status == "Present":
-                    submissions[key]["present"].append(student_id)
-                else:
-                    submissions[key]["absent"].append(student_id)
-
-            summary_text = []
-            absence_details = {}
-            for key, data in submissions.items():
-                date, lesson, day, period = key
-                absence_count = len(data["absent"])
-                absence_details[key] = data["absent"]
-                if absence_count == 0:
-                    summary_text.append(f"Date: {date}, Lesson: {lesson}, Day: {day}, Period: {period}, Full Presence")
-                else:
-                    summary_text.append(
-                        f"Date: {date}, Lesson: {lesson}, Day: {day}, Period: {period}, {absence_count} absence(s)")
-
-            records_window = RecordsWindow("\n".join(summary_text), absence_details, self)
+            from .records_window import RecordsWindow
+
+            records_window = RecordsWindow(self.db_manager, self, preload)
+            records_window.export_requested.connect(self.export_to_excel)
             records_window.show()
             self.records_window = records_window
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to view records: {str(e)}")
 
-    def export_to_excel(self):
+    def view_analytics(self):
+        try:
+            min_rate = self.config_manager.get_attendance_alert_rate()
+            streak_alert = self.config_manager.get_absence_streak_alert()
+
+            def build_reports(progress):
+                from ..analytics.attendance_analytics import AttendanceAnalytics
+
+                analytics = AttendanceAnalytics(self.db_manager)
+                analytics.load()
+                return analytics.lesson_report(min_rate, streak_alert), analytics.student_report(min_rate)
+
+            self.run_task("Computing attendance analytics", build_reports,
+                          lambda reports: self.show_analytics_window(reports, min_rate, streak_alert))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to compute analytics: {str(e)}")
+
+    def show_analytics_window(self, reports, min_rate, streak_alert):
+        try:
+            lesson_rows, student_rows = reports
+            if not student_rows:
+                QMessageBox.information(self, "No Records", "No submission records found.")
+                return
+
+            from .analytics_window import AnalyticsWindow
+
+            analytics_window = AnalyticsWindow(lesson_rows, student_rows, min_rate, streak_alert, self)
+            analytics_window.show()
+            self.analytics_window = analytics_window
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to show analytics: {str(e)}")
+
+    def view_at_risk_students(self):
+        try:
+            percent, ok = QInputDialog.getInt(self, "At-Risk Students", "Show students with attendance below (%):",
+                                              70, 1, 100)
+            if not ok:
+                return
+            # Scoped to the selected lesson when there is one
+            lesson_name = self.current_lesson
+            rows = self.db_manager.fetch_at_risk_students(percent / 100, lesson_name)
+            from .at_risk_window import AtRiskWindow
+
+            at_risk_window = AtRiskWindow(rows, percent / 100, lesson_name, self)
+            at_risk_window.show()
+            self.at_risk_window = at_risk_window
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to show at-risk students: {str(e)}")
+
+    def view_lesson_calendar(self):
+        try:
+            def load_calendar(progress):
+                return self.calendar_manager.lessons_on(), self.calendar_manager.missing_sessions()
+
+            self.run_task("Checking the lesson calendar", load_calendar, self.show_lesson_calendar)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to check the lesson calendar: {str(e)}")
+
+    def show_lesson_calendar(self, result):
         try:
-            records = self.db_manager.fetch_submissions_for_export()
-            if not records:
+            from .calendar_window import CalendarWindow
+
+            calendar_window = CalendarWindow(*result, self)
+            calendar_window.lesson_selected.connect(self.lesson_combo.setCurrentText)
+            calendar_window.show()
+            self.calendar_window = calendar_window
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to show the lesson calendar: {str(e)}")
+
+    def check_summaries(self):
+        try:
+            self.run_task("Checking attendance summaries", lambda progress: self.db_manager.check_summaries(),
+                          self.summaries_checked)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to check summaries: {str(e)}")
+
+    def summaries_checked(self, mismatches):
+        try:
+            if mismatches is None:
+                return
+            if not any(mismatches.values()):
+                QMessageBox.information(self, "Attendance Summaries", "Attendance summaries are consistent.")
+                return
+            details = "\n".join(f"{table}: {count} rows differ" for table, count in mismatches.items())
+            reply = QMessageBox.question(self, "Attendance Summaries",
+                                         f"{details}\nRebuild the summaries from the submission records?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                self.run_task("Rebuilding attendance summaries",
+                              lambda progress: self.db_manager.rebuild_summaries(),
+                              lambda success: success and QMessageBox.information(
+                                  self, "Attendance Summaries", "Attendance summaries rebuilt."))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to check summaries: {str(e)}")
+
+    def view_performance_stats(self):
+        try:
+            if not INSTRUMENTATION.enabled:
+                QMessageBox.information(self, "Performance Stats",
+                                        "Instrumentation is off. Set \"instrumentation_enabled\": true in "
+                                        "saving_data/config.json and restart to record operation timings.")
+                return
+            from .stats_window import StatsWindow
+
+            stats_window = StatsWindow(self)
+            stats_window.show()
+            self.stats_window = stats_window
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to show performance stats: {str(e)}")
+
+    def export_to_excel(self, filters=None):
+        # filters are DatabaseManager.record_filter keywords, e.g. from the records window
+        try:
+            if not (self.db_manager.count_records(**filters) if filters else self.db_manager.count_sessions()):
                 QMessageBox.information(self, "No Records", "No submission records to export.")
                 return
 
-            df = pd.DataFrame(records, columns=["Date", "Lesson", "Day", "Period", "Student ID", "Status"])
-            save_path, _ = QFileDialog.getSaveFileName(self, "Save Excel File", self.save_dir, "Excel Files (*.xlsx)")
+            save_path, selected_filter = QFileDialog.getSaveFileName(
+                self, "Export Submission Records", self.save_dir,
+                "Excel Files (*.xlsx);;CSV Files (*.csv);;Parquet Files (*.parquet)")
+            if save_path:
+                if not os.path.splitext(save_path)[1]:
+                    save_path += selected_filter[selected_filter.index("*") + 1:-1]
+                from ..database.export_manager import ExportManager
+
+                exporter = ExportManager(self.db_manager)
+                self.run_task("Exporting records", lambda progress: exporter.export(save_path, progress, filters),
+                              lambda count: QMessageBox.information(
+                                  self, "Success", f"{count} submission records exported to {save_path}"))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export records: {str(e)}")
+
+    def export_new_records(self):
+        try:
+            # An existing file is the point here: CSV targets are appended to, so skip the overwrite prompt
+            save_path, selected_filter = QFileDialog.getSaveFileName(
+                self, "Export New Submission Records", self.save_dir,
+                "CSV Files (*.csv);;Excel Files (*.xlsx);;Parquet Files (*.parquet)",
+                options=QFileDialog.Option.DontConfirmOverwrite)
             if save_path:
-                try:
-                    df.to_excel(save_path, index=False)
-                    QMessageBox.information(self, "Success", f"Submission records exported to {save_path}")
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to export to Excel: {str(e)}")
+                if not os.path.splitext(save_path)[1]:
+                    save_path += selected_filter[selected_filter.index("*") + 1:-1]
+                from ..database.export_manager import ExportManager
+
+                exporter = ExportManager(self.db_manager)
+                # The first run writes the full history, so a file this tool never exported to is replaced
+                overwrite = exporter.replaces_existing_file(save_path)
+                if overwrite:
+                    reply = QMessageBox.question(self, "Replace File",
+                                                 f"{save_path} was not written by an earlier export of new "
+                                                 f"records. Replace it with all submission records?",
+                                                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+                    if reply != QMessageBox.StandardButton.Yes:
+                        return
+                self.run_task("Exporting new records",
+                              lambda progress: exporter.export_incremental(save_path, progress, overwrite=overwrite),
+                              self.new_records_exported)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export new records: {str(e)}")
+
+    def new_records_exported(self, result):
+        output_path, count = result
+        if output_path:
+            QMessageBox.information(self, "Success",
+                                    f"{count} new or corrected submission records written to {output_path}")
+        else:
+            QMessageBox.information(self, "No New Records", "No submission records since the last export.")
+
+    def archive_closed_terms(self):
+        try:
+            from ..database.archive_manager import ArchiveManager
+
+            archive_manager = ArchiveManager(self.db_manager)
+            terms = archive_manager.closed_terms()
+            if not terms:
+                QMessageBox.information(self, "Archive", "No finished lessons with records to archive.")
+                return
+            reply = QMessageBox.question(self, "Archive Closed Terms",
+                                         f"Move the records of {sum(len(ids) for ids in terms.values())} finished "
+                                         f"lesson(s) in term(s) {', '.join(terms)} to archive files in "
+                                         f"{archive_manager.archive_dir}?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+            self.run_task("Archiving closed terms", lambda progress: archive_manager.archive_closed_terms(
+                progress=progress), lambda moved: QMessageBox.information(
+                self, "Archive", "\n".join(f"Term {term}: {rows} records archived" for term, rows in moved.items())))
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export to Excel: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to archive closed terms: {str(e)}")
 
     def import_data(self):
         try:
             # Choose file type
             file_type, ok = QInputDialog.getItem(self, "Select File Type", "Choose the file type to import:",
-                                                 ["SQLite Database (.db)", "Excel (.xlsx)"], 0, False)
+                                                 ["SQLite Database (.db)", "Excel (.xlsx)", "CSV (.csv)"], 0, False)
             if not ok:
                 return
 
@@ -238,7 +487,7 @@ class AbsenceWindow(QMainWindow):
                 required_columns = "name (unique text), day (e.g., 月曜日), period (e.g., 1-2), begin_date (yyyy-MM-dd), end_date (yyyy-MM-dd)"
                 details_key = "lesson_info"
             elif import_type == "Student Info":
-                required_columns = "student_id (unique text, e.g., NUS:022500203)"
+                required_columns = "student_id (unique text, e.g., NUS:022500203), optional lesson (enrolls the student)"
                 details_key = "student_info"
             else:  # Presence Info
                 required_columns = "date (yyyy-MM-dd), lesson (text), day (e.g., 月曜日), period (e.g., 1-2), student_id (text), status (Present or Absent)"
@@ -255,6 +504,8 @@ class AbsenceWindow(QMainWindow):
             if result == QMessageBox.StandardButton.Cancel:
                 return
             elif msg.clickedButton() == details_button:
+                from .import_details_window import ImportDetailsWindow
+
                 details_window = ImportDetailsWindow(details_key, self)
                 details_window.show()
                 return  # Wait for user to proceed after viewing details
@@ -263,39 +514,113 @@ class AbsenceWindow(QMainWindow):
             if file_type == "SQLite Database (.db)":
                 file_path, _ = QFileDialog.getOpenFileName(self, "Select Database File", self.save_dir,
                                                            "SQLite Database (*.db)")
-            else:  # Excel
+            elif file_type == "Excel (.xlsx)":
                 file_path, _ = QFileDialog.getOpenFileName(self, "Select Excel File", self.save_dir,
                                                            "Excel Files (*.xlsx)")
+            else:  # CSV
+                file_path, _ = QFileDialog.getOpenFileName(self, "Select CSV File", self.save_dir,
+                                                           "CSV Files (*.csv)")
 
             if not file_path:
                 return
 
-            # Import data
-            success = False
-            if import_type == "Lesson Info":
-                success = self.db_manager.import_lesson_info(file_path, file_type == "SQLite Database (.db)")
+            # Choose how rows that already exist are handled
+            conflict = "skip"
+            if import_type == "Presence Info":
+                conflict_choice, ok = QInputDialog.getItem(self, "Existing Records",
+                                                           "When a student already has a record for the session:",
+                                                           list(CONFLICT_CHOICES), 0, False)
+                if not ok:
+                    return
+                conflict = CONFLICT_CHOICES[conflict_choice]
+
+            # Import data in the background
+            is_db = file_type == "SQLite Database (.db)"
+            if not is_db and self.use_streaming_import(file_path):
+                kind = {"Lesson Info": "lesson", "Student Info": "student", "Presence Info": "presence"}[import_type]
+                resume = self.ask_resume_import(file_path, kind)
+                batch_size = self.config_manager.get_import_batch_size()
+
+                def run_import(progress):
+                    self.db_manager.import_file_streaming(file_path, kind, batch_size, resume, progress, conflict)
+                    return True
+            elif import_type == "Lesson Info":
+                def run_import(progress):
+                    return self.db_manager.import_lesson_info(file_path, is_db, progress)
             elif import_type == "Student Info":
-                success = self.db_manager.import_student_info(file_path, file_type == "SQLite Database (.db)",
-                                                              self.student_ids)
+                def run_import(progress):
+                    return self.db_manager.import_student_info(file_path, is_db, self.student_ids, progress)
             else:  # Presence Info
-                success = self.db_manager.import_presence_info(file_path, file_type == "SQLite Database (.db)")
+                def run_import(progress):
+                    return self.db_manager.import_presence_info(file_path, is_db, progress, conflict)
 
+            self.run_task(f"Importing {import_type}", run_import,
+                          lambda success: self.import_finished(import_type, success))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to import data: {str(e)}")
+
+    def import_finished(self, import_type, success):
+        try:
             if success:
-                self.lessons = self.db_manager.load_lessons()
-                self.update_lesson_combo()
-                QMessageBox.information(self, "Success", f"{import_type} imported successfully.")
+                if import_type == "Student Info":
+                    self.student_ids[:] = self.db_manager.load_roster()
+                self.apply_lesson_changes()
+                stats = self.db_manager.last_import_stats
+                QMessageBox.information(self, "Success",
+                                        f"{import_type} imported successfully.\n"
+                                        f"{stats['rows']} rows in {stats['seconds']:.2f} s "
+                                        f"({stats['rows_per_sec']:.0f} rows/sec)")
             else:
                 QMessageBox.critical(self, "Error", f"Failed to import {import_type}. Check file format and columns.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to import data: {str(e)}")
 
+    def use_streaming_import(self, file_path):
+        threshold = self.config_manager.get_streaming_import_threshold_mb() * 1024 * 1024
+        return file_path.lower().endswith(".csv") or os.path.getsize(file_path) >= threshold
+
+    def ask_resume_import(self, file_path, kind):
+        rows_done = self.db_manager.get_import_checkpoint(file_path, kind)
+        if not rows_done:
+            return True
+        reply = QMessageBox.question(self, "Resume Import",
+                                     f"A previous import of this file stopped after row {rows_done}. Resume from there?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return reply == QMessageBox.StandardButton.Yes
+
+    def run_task(self, label, func, on_finished):
+        progress_dialog = QProgressDialog(label, "Cancel", 0, 0, self)
+        progress_dialog.setWindowTitle("Please Wait")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+        started = time.perf_counter()
+
+        def finished(result):
+            progress_dialog.close()
+            INSTRUMENTATION.record("gui", label, time.perf_counter() - started)
+            on_finished(result)
+
+        def failed(message):
+            progress_dialog.close()
+            INSTRUMENTATION.record("gui", f"{label} (failed)", time.perf_counter() - started)
+            QMessageBox.critical(self, "Error", f"{label} failed: {message}")
+
+        def cancelled():
+            progress_dialog.close()
+            INSTRUMENTATION.record("gui", f"{label} (cancelled)", time.perf_counter() - started)
+            QMessageBox.information(self, "Cancelled", f"{label} was cancelled. Uncommitted changes were rolled back.")
+
+        def progressed(value):
+            progress_dialog.setLabelText(f"{label}\n{value} rows processed")
+
+        task = self.task_runner.start(func, finished, failed, cancelled, progressed)
+        progress_dialog.canceled.connect(task.cancel)
+        return task
+
     def update_lesson_data(self, old_name, new_data):
         try:
             self.db_manager.update_lesson(old_name, new_data)
-            self.lessons[new_data["name"]] = new_data
-            if old_name != new_data["name"] and old_name in self.lessons:
-                del self.lessons[old_name]
-            self.update_lesson_combo()
+            self.apply_lesson_changes()
             self.lesson_combo.setCurrentText(new_data["name"])
             self.update_lesson_info_display()
         except Exception as e:
@@ -0,0 +1,138 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class RecordsTableModel(QAbstractTableModel):
+    HEADERS = ["Date", "Lesson", "Day", "Period", "Present", "Absent"]
+    SORT_KEYS = ["date", "lesson", "day", "period", "present", "absent"]
+    PAGE_SIZE = 200
+
+    def __init__(self, db_manager, parent=None, preload=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.rows = []
+        self.total = 0
+        self.filter_text = ""
+        self.order_by = "date"
+        self.descending = False
+        self.loaded = False
+        if preload:
+            # (total, first page) already fetched off the GUI thread
+            self.total, self.rows = preload[0], list(preload[1])
+            self.loaded = True
+        else:
+            self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []
+        self.total = self.db_manager.count_sessions(self.filter_text)
+        self.loaded = True
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def set_filter(self, filter_text):
+        self.filter_text = filter_text.strip()
+        self.reload()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(row[index.column() + 1])
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() >= 4:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and len(self.rows) < self.total
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        page = self.db_manager.fetch_session_summary(self.PAGE_SIZE, len(self.rows), self.filter_text,
+                                                     self.order_by, self.descending)
+        if not page:
+            self.total = len(self.rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        order_by = self.SORT_KEYS[column]
+        descending = order == Qt.SortOrder.DescendingOrder
+        if self.loaded and (order_by, descending) == (self.order_by, self.descending):
+            return
+        self.order_by = order_by
+        self.descending = descending
+        self.reload()
+
+    def session_at(self, row):
+        return self.rows[row]
+
+
+class SubmissionRecordsModel(QAbstractTableModel):
+    # Individual submissions matching DatabaseManager.record_filter keywords, fetched a page at a time
+    HEADERS = ["Date", "Lesson", "Day", "Period", "Student ID", "Status"]
+    PAGE_SIZE = 500
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.rows = []
+        self.total = 0
+        self.filters = {}
+
+    def set_filters(self, filters):
+        self.beginResetModel()
+        self.filters = dict(filters)
+        self.rows = []
+        self.total = self.db_manager.count_records(**self.filters)
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(self.rows[index.row()][index.column()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and len(self.rows) < self.total
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        page = self.db_manager.fetch_records(limit=self.PAGE_SIZE, offset=len(self.rows), **self.filters)
+        if not page:
+            self.total = len(self.rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
\ No newline at end of file
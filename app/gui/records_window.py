@@ -1,36 +1,138 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTextEdit, QPushButton
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QLineEdit, QTableView, \
+    QAbstractItemView, QMessageBox, QTabWidget, QComboBox, QCheckBox, QDateEdit, QPushButton, QLabel
+from PyQt6.QtCore import Qt, QDate, pyqtSignal
+from .records_model import RecordsTableModel, SubmissionRecordsModel
 
 class RecordsWindow(QMainWindow):
-    def __init__(self, summary_text, absence_details, parent=None):
+    # Emitted with the record_filter keywords of the Submissions tab
+    export_requested = pyqtSignal(dict)
+
+    def __init__(self, db_manager, parent=None, preload=None):
         super().__init__(parent)
         self.setWindowTitle("Submission Records")
-        self.setGeometry(150, 150, 600, 400)
-        self.absence_details = absence_details
+        self.setGeometry(150, 150, 800, 550)
+        self.db_manager = db_manager
+
+        tabs = QTabWidget()
+        self.setCentralWidget(tabs)
+        sessions_widget = QWidget()
+        layout = QVBoxLayout()
+        sessions_widget.setLayout(layout)
+        tabs.addTab(sessions_widget, "Sessions")
+        tabs.addTab(self.build_submissions_tab(), "Submissions")
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by lesson, date or day")
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        layout.addWidget(self.filter_edit)
+
+        self.model = RecordsTableModel(db_manager, self, preload)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.verticalHeader().setDefaultSectionSize(22)
+        self.table_view.selectionModel().selectionChanged.connect(self.show_absence_details)
+        layout.addWidget(self.table_view)
 
-        main_widget = QWidget()
-        self.setCentralWidget(main_widget)
+        self.details_text = QTextEdit()
+        self.details_text.setReadOnly(True)
+        self.details_text.setFixedHeight(120)
+        self.details_text.setPlaceholderText("Select sessions to show absent students.")
+        layout.addWidget(self.details_text)
+
+    def build_submissions_tab(self):
+        widget = QWidget()
         layout = QVBoxLayout()
-        main_widget.setLayout(layout)
+        widget.setLayout(layout)
+
+        filter_layout = QHBoxLayout()
+        self.lesson_filter = QComboBox()
+        self.lesson_filter.addItem("All Lessons")
+        self.lesson_filter.addItems(sorted(self.db_manager.load_lessons()))
+        filter_layout.addWidget(self.lesson_filter)
+        self.student_filter = QLineEdit()
+        self.student_filter.setPlaceholderText("Student ID")
+        self.student_filter.returnPressed.connect(self.apply_record_filters)
+        filter_layout.addWidget(self.student_filter)
+        self.status_filter = QComboBox()
+        self.status_filter.addItems(["All Statuses", "Present", "Absent"])
+        filter_layout.addWidget(self.status_filter)
+        self.date_range_check = QCheckBox("From")
+        filter_layout.addWidget(self.date_range_check)
+        self.start_date_edit = QDateEdit(QDate.currentDate().addMonths(-6))
+        self.end_date_edit = QDateEdit(QDate.currentDate())
+        for date_edit, label in ((self.start_date_edit, None), (self.end_date_edit, "to")):
+            if label:
+                filter_layout.addWidget(QLabel(label))
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setEnabled(False)
+            self.date_range_check.toggled.connect(date_edit.setEnabled)
+            filter_layout.addWidget(date_edit)
+        apply_button = QPushButton("Apply")
+        apply_button.clicked.connect(self.apply_record_filters)
+        filter_layout.addWidget(apply_button)
+        layout.addLayout(filter_layout)
+
+        self.submissions_model = SubmissionRecordsModel(self.db_manager, self)
+        submissions_view = QTableView()
+        submissions_view.setModel(self.submissions_model)
+        submissions_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        submissions_view.verticalHeader().setDefaultSectionSize(22)
+        layout.addWidget(submissions_view)
+
+        bottom_layout = QHBoxLayout()
+        self.record_count_label = QLabel("Set filters and press Apply.")
+        bottom_layout.addWidget(self.record_count_label)
+        bottom_layout.addStretch()
+        export_button = QPushButton("Export Filtered Records")
+        export_button.clicked.connect(lambda: self.export_requested.emit(self.record_filters()))
+        bottom_layout.addWidget(export_button)
+        layout.addLayout(bottom_layout)
+        return widget
+
+    def record_filters(self):
+        filters = {}
+        if self.lesson_filter.currentIndex() > 0:
+            filters["lesson_name"] = self.lesson_filter.currentText()
+        if self.student_filter.text().strip():
+            filters["student_id"] = self.student_filter.text().strip()
+        if self.status_filter.currentIndex() > 0:
+            filters["status"] = self.status_filter.currentText()
+        if self.date_range_check.isChecked():
+            filters["start_date"] = self.start_date_edit.date().toString("yyyy-MM-dd")
+            filters["end_date"] = self.end_date_edit.date().toString("yyyy-MM-dd")
+        return filters
 
-        self.text_edit = QTextEdit()
-        self.text_edit.setReadOnly(True)
-        self.text_edit.setText(summary_text)
-        layout.addWidget(self.text_edit)
+    def apply_record_filters(self):
+        try:
+            self.submissions_model.set_filters(self.record_filters())
+            self.record_count_label.setText(f"{self.submissions_model.total} matching records")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to filter records: {str(e)}")
 
-        if any(details for details in absence_details.values()):
-            self.show_absences_button = QPushButton("Show Absence Details")
-            self.show_absences_button.clicked.connect(self.show_absence_details)
-            layout.addWidget(self.show_absences_button)
+    def apply_filter(self):
+        try:
+            self.model.set_filter(self.filter_edit.text())
+            self.details_text.clear()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to filter records: {str(e)}")
 
     def show_absence_details(self):
-        detail_text = []
-        for key, details in self.absence_details.items():
-            if details:
-                date, lesson, day, period = key
+        try:
+            rows = sorted({index.row() for index in self.table_view.selectionModel().selectedRows()})
+            sessions = [self.model.session_at(row) for row in rows]
+            sessions = [session for session in sessions if session[6]]
+            absence_details = self.db_manager.fetch_absentees([session[0] for session in sessions])
+            detail_text = []
+            for session_id, date, lesson, day, period, _, _ in sessions:
                 detail_text.append(f"Date: {date}, Lesson: {lesson}, Day: {day}, Period: {period}")
                 detail_text.append("Absent Students:")
-                for student_id in details:
+                for student_id in absence_details[session_id]:
                     detail_text.append(f"  - {student_id}")
                 detail_text.append("")
-        self.text_edit.setText("\n".join(detail_text))
-        self.show_absences_button.hide()
\ No newline at end of file
+            self.details_text.setText("\n".join(detail_text))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to show absence details: {str(e)}")
\ No newline at end of file
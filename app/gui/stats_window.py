@@ -0,0 +1,50 @@
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, \
+    QAbstractItemView, QMessageBox
+from PyQt6.QtCore import Qt
+from ..utils.instrumentation import INSTRUMENTATION
+
+
+class StatsWindow(QMainWindow):
+    HEADERS = ["Kind", "Operation", "Calls", "p50 (ms)", "p95 (ms)", "Max (ms)", "Slow"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance Stats")
+        self.setGeometry(150, 150, 700, 400)
+
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout()
+        main_widget.setLayout(layout)
+
+        layout.addWidget(QLabel(f"Slow threshold: {INSTRUMENTATION.slow_threshold_ms} ms. "
+                                f"Details are logged to saving_data/instrumentation.log."))
+
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        layout.addWidget(self.table)
+
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        layout.addWidget(refresh_button)
+        self.refresh()
+
+    def refresh(self):
+        try:
+            rows = INSTRUMENTATION.stats()
+            self.table.setSortingEnabled(False)
+            self.table.setRowCount(len(rows))
+            for row, values in enumerate(rows):
+                for column, value in enumerate(values):
+                    item = QTableWidgetItem()
+                    if isinstance(value, float):
+                        item.setData(Qt.ItemDataRole.DisplayRole, round(value, 1))
+                    else:
+                        item.setData(Qt.ItemDataRole.DisplayRole, value)
+                    self.table.setItem(row, column, item)
+            self.table.setSortingEnabled(True)
+            self.table.resizeColumnToContents(1)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to refresh stats: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,72 @@
+from bisect import bisect_left
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+
+
+class StudentListModel(QAbstractListModel):
+    # (present, absent) after every change
+    counts_changed = pyqtSignal(int, int)
+
+    def __init__(self, student_ids, present_students, parent=None):
+        super().__init__(parent)
+        self.student_ids = list(student_ids)
+        # Shared with the main window, so marks survive closing and reopening the window
+        self.present_students = present_students
+        rows = {student_id: row for row, student_id in enumerate(self.student_ids)}
+        # Sorted (key, row) pairs; a card may carry the full ID or only the part after the prefix
+        short_keys = [(student_id.rsplit(":", 1)[1].upper(), row)
+                      for student_id, row in rows.items() if ":" in student_id]
+        full_keys = [(student_id.upper(), row) for student_id, row in rows.items()]
+        self.index_keys = sorted(short_keys + full_keys)
+        # Full IDs are added last so they win over a clashing short form
+        self.aliases = dict(short_keys + full_keys)
+        self.present_count = sum(1 for student_id in self.student_ids if student_id in present_students)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.student_ids)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        student_id = self.student_ids[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return student_id
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if student_id in self.present_students else Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+        self.set_present(index.row(), Qt.CheckState(value) == Qt.CheckState.Checked)
+        return True
+
+    def set_present(self, row, present):
+        student_id = self.student_ids[row]
+        if (student_id in self.present_students) == present:
+            return False
+        if present:
+            self.present_students.add(student_id)
+            self.present_count += 1
+        else:
+            self.present_students.discard(student_id)
+            self.present_count -= 1
+        # Only the changed row is repainted
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.counts_changed.emit(self.present_count, len(self.student_ids) - self.present_count)
+        return True
+
+    def find_exact(self, text):
+        return self.aliases.get(text.strip().upper())
+
+    def find_prefix(self, text):
+        # Rows whose ID starts with text, via two binary searches over the sorted keys
+        prefix = text.strip().upper()
+        if not prefix:
+            return []
+        start = bisect_left(self.index_keys, (prefix,))
+        end = bisect_left(self.index_keys, (prefix + "\uffff",), start)
+        return sorted({row for _, row in self.index_keys[start:end]})
\ No newline at end of file
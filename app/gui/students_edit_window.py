@@ -1,11 +1,12 @@
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton, QInputDialog, QMessageBox
 
 class StudentsEditWindow(QMainWindow):
-    def __init__(self, student_ids, parent=None):
+    def __init__(self, student_ids, db_manager, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Edit Students Info")
         self.setGeometry(200, 200, 400, 400)
         self.student_ids = student_ids
+        self.db_manager = db_manager
         self.parent = parent
 
         main_widget = QWidget()
@@ -45,11 +46,12 @@ class StudentsEditWindow(QMainWindow):
     def add_student(self):
         try:
             student_id, ok = QInputDialog.getText(self, "Add Student ID", "Enter new student ID:")
-            if ok and student_id and student_id not in self.student_ids:
+            if ok and student_id and not self.db_manager.has_student(student_id):
+                self.db_manager.add_students([student_id])
                 self.student_ids.append(student_id)
-                self.update_student_list()
+                self.student_list.addItem(QListWidgetItem(f"Student {len(self.student_ids)} (ID: {student_id})"))
                 QMessageBox.information(self, "Success", f"Added student ID: {student_id}")
-            elif ok and student_id in self.student_ids:
+            elif ok and self.db_manager.has_student(student_id):
                 QMessageBox.warning(self, "Duplicate ID", "This student ID already exists.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add student: {str(e)}")
@@ -61,14 +63,15 @@ class StudentsEditWindow(QMainWindow):
                 QMessageBox.warning(self, "No Selection", "Please select a student to edit.")
                 return
 
-            old_id = self.student_ids[self.student_list.row(selected_items[0])]
+            index = self.student_list.row(selected_items[0])
+            old_id = self.student_ids[index]
             new_id, ok = QInputDialog.getText(self, "Edit Student ID", "Enter new student ID:", text=old_id)
-            if ok and new_id and new_id not in self.student_ids:
-                index = self.student_ids.index(old_id)
+            if ok and new_id and not self.db_manager.has_student(new_id) and \
+                    self.db_manager.rename_student(old_id, new_id):
                 self.student_ids[index] = new_id
-                self.update_student_list()
+                selected_items[0].setText(f"Student {index + 1} (ID: {new_id})")
                 QMessageBox.information(self, "Success", f"Changed student ID to: {new_id}")
-            elif ok and new_id in self.student_ids:
+            elif ok and new_id:
                 QMessageBox.warning(self, "Duplicate ID", "This student ID already exists.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to edit student: {str(e)}")
@@ -80,12 +83,14 @@ class StudentsEditWindow(QMainWindow):
                 QMessageBox.warning(self, "No Selection", "Please select a student to delete.")
                 return
 
-            student_id = self.student_ids[self.student_list.row(selected_items[0])]
+            index = self.student_list.row(selected_items[0])
+            student_id = self.student_ids[index]
             reply = QMessageBox.question(self, "Confirm Deletion",
                                         f"Delete student ID {student_id}?",
                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                self.student_ids.remove(student_id)
+                self.db_manager.remove_student(student_id)
+                del self.student_ids[index]
                 self.update_student_list()
                 QMessageBox.information(self, "Success", f"Deleted student ID: {student_id}")
         except Exception as e:
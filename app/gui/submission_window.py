@@ -1,14 +1,14 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton, \
-    QMessageBox, QDateEdit
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListView, QLineEdit, QLabel, \
+    QPushButton, QMessageBox, QDateEdit
 from PyQt6.QtCore import QDate
-from ..database.db_manager import DatabaseManager
+from .student_list_model import StudentListModel
 
 
 class SubmissionWindow(QMainWindow):
     def __init__(self, student_ids, lesson_data, present_students, db_manager, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Submission")
-        self.setGeometry(200, 200, 400, 400)
+        self.setGeometry(200, 200, 400, 500)
         self.student_ids = student_ids
         self.lesson_data = lesson_data
         self.present_students = present_students
@@ -26,38 +26,74 @@ class SubmissionWindow(QMainWindow):
         self.date_edit.setCalendarPopup(True)
         layout.addWidget(self.date_edit)
 
-        self.student_list = QListWidget()
-        self.student_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
-        for student_id in self.student_ids:
-            item = QListWidgetItem(student_id)
-            item.setData(1, student_id)
-            self.student_list.addItem(item)
+        # Barcode scanners type the ID and press Enter, which marks the student present
+        self.scan_edit = QLineEdit()
+        self.scan_edit.setPlaceholderText("Scan a card or type a student ID, then press Enter")
+        self.scan_edit.textEdited.connect(self.show_matches)
+        self.scan_edit.returnPressed.connect(self.mark_scanned_student)
+        layout.addWidget(self.scan_edit)
+
+        self.scan_status = QLabel()
+        layout.addWidget(self.scan_status)
+
+        self.model = StudentListModel(student_ids, present_students, self)
+        self.model.counts_changed.connect(self.update_counter)
+        self.student_list = QListView()
+        # Uniform rows let the view lay out only the visible items
+        self.student_list.setUniformItemSizes(True)
+        self.student_list.setModel(self.model)
         layout.addWidget(self.student_list)
 
+        self.counter_label = QLabel()
+        layout.addWidget(self.counter_label)
+        self.update_counter(self.model.present_count, len(student_ids) - self.model.present_count)
+
         button_layout = QHBoxLayout()
-        self.submit_presence_button = QPushButton("Submit Presence")
-        self.submit_presence_button.clicked.connect(self.submit_presence)
         self.final_submit_button = QPushButton("Final Submission")
         self.final_submit_button.clicked.connect(self.final_submission)
-        button_layout.addWidget(self.submit_presence_button)
         button_layout.addWidget(self.final_submit_button)
         layout.addLayout(button_layout)
+        self.scan_edit.setFocus()
 
-    def submit_presence(self):
+    def update_counter(self, present, absent):
+        self.counter_label.setText(f"Present: {present}    Absent: {absent}    Total: {present + absent}")
+
+    def show_matches(self, text):
         try:
-            selected_items = self.student_list.selectedItems()
-            if not selected_items:
-                QMessageBox.warning(self, "No Selection", "Please select at least one student.")
+            rows = self.model.find_prefix(text)
+            if not text.strip():
+                self.scan_status.clear()
                 return
+            if not rows:
+                self.scan_status.setText("No matching student")
+                return
+            self.student_list.setCurrentIndex(self.model.index(rows[0]))
+            self.student_list.scrollTo(self.model.index(rows[0]))
+            self.scan_status.setText(f"{len(rows)} matching student(s)")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to search students: {str(e)}")
 
-            for item in selected_items:
-                student_id = item.data(1)
-                self.present_students.add(student_id)
-
-            QMessageBox.information(self, "Success", f"Presence recorded for {len(selected_items)} student(s).")
-            self.student_list.clearSelection()
+    def mark_scanned_student(self):
+        try:
+            text = self.scan_edit.text()
+            row = self.model.find_exact(text)
+            if row is None:
+                # A unique prefix is enough when typing by hand
+                rows = self.model.find_prefix(text)
+                row = rows[0] if len(rows) == 1 else None
+            if row is None:
+                self.scan_status.setText(f"Not found or ambiguous: {text.strip()}")
+                return
+            student_id = self.model.student_ids[row]
+            if self.model.set_present(row, True):
+                self.scan_status.setText(f"Marked present: {student_id}")
+            else:
+                self.scan_status.setText(f"Already present: {student_id}")
+            self.student_list.setCurrentIndex(self.model.index(row))
+            self.student_list.scrollTo(self.model.index(row))
+            self.scan_edit.clear()
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to submit presence: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to mark student present: {str(e)}")
 
     def final_submission(self):
         try:
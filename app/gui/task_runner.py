@@ -0,0 +1,70 @@
+import threading
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..database.db_manager import OperationCancelled
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Task(QRunnable):
+    def __init__(self, func, cleanup=None):
+        super().__init__()
+        self.func = func
+        self.cleanup = cleanup
+        self.signals = TaskSignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report_progress(self, value):
+        # Raising here unwinds the database call, so any open transaction is rolled back
+        if self.cancel_event.is_set():
+            raise OperationCancelled()
+        self.signals.progress.emit(value)
+
+    def run(self):
+        try:
+            result = self.func(self.report_progress)
+            self.signals.finished.emit(result)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            if self.cleanup:
+                self.cleanup()
+
+
+class TaskRunner(QObject):
+    # cleanup runs on the worker thread after every task. Python does not keep thread-local state for
+    # pool threads between tasks, so per-thread resources such as database connections are released there.
+    def __init__(self, cleanup=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.cleanup = cleanup
+        self.tasks = set()
+
+    def start(self, func, on_finished=None, on_failed=None, on_cancelled=None, on_progress=None):
+        task = Task(func, self.cleanup)
+        task.setAutoDelete(False)
+        self.tasks.add(task)
+        handlers = ((task.signals.finished, on_finished), (task.signals.failed, on_failed),
+                    (task.signals.cancelled, on_cancelled), (task.signals.progress, on_progress))
+        for signal, handler in handlers:
+            if handler:
+                signal.connect(handler)
+        # Connected last so the task stays referenced until every handler has run
+        for signal in (task.signals.finished, task.signals.failed, task.signals.cancelled):
+            signal.connect(lambda *_, task=task: self.tasks.discard(task))
+        self.pool.start(task)
+        return task
+
+    def wait_for_done(self):
+        for task in list(self.tasks):
+            task.cancel()
+        self.pool.waitForDone()
\ No newline at end of file
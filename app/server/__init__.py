@@ -0,0 +1 @@
+# Subpackage initialization for server
\ No newline at end of file
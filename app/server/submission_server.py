@@ -0,0 +1,169 @@
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ..database.db_manager import DatabaseError, PRESENCE_COLUMNS
+
+STATUSES = ("Present", "Absent")
+# Largest number of rows committed in one transaction by the writer
+MAX_BATCH_ROWS = 5000
+# Longest accepted request line in bytes
+REQUEST_LIMIT = 4 * 1024 * 1024
+
+
+class LatencyStats:
+    def __init__(self, window=10000):
+        # Only the most recent requests count towards the percentiles
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.commits = 0
+        self.committed_rows = 0
+
+    def add_commit(self, rows, latencies):
+        self.commits += 1
+        self.committed_rows += rows
+        self.requests += len(latencies)
+        self.latencies.extend(latencies)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return round(latencies[int((len(latencies) - 1) * fraction)], 3) if latencies else None
+
+        return {
+            "requests": self.requests,
+            "commits": self.commits,
+            "rows": self.committed_rows,
+            "rows_per_commit": round(self.committed_rows / self.commits, 1) if self.commits else 0,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(latencies[-1], 3) if latencies else None
+        }
+
+
+class SubmissionServer:
+    # Line-delimited JSON over TCP. A request is one submission object with the presence columns,
+    # {"submissions": [...]} for several, or {"op": "stats"}; each gets one JSON line back.
+    def __init__(self, db_manager, host="127.0.0.1", port=8765, max_batch_rows=MAX_BATCH_ROWS):
+        self.db_manager = db_manager
+        self.host = host
+        self.port = port
+        self.max_batch_rows = max_batch_rows
+        self.stats = LatencyStats()
+        # Every write happens on this one thread, so clients never contend for the database lock
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="submission-writer")
+        self.queue = None
+        self.server = None
+        self.writer_task = None
+        self.clients = set()
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.write_loop())
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port, limit=REQUEST_LIMIT)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        if not self.server:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            # Idle connections would otherwise keep wait_closed() waiting
+            for writer in list(self.clients):
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.writer_task:
+            # Commit whatever is still queued before shutting the writer down
+            await self.queue.join()
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+            self.writer_task = None
+        self.executor.shutdown(wait=True)
+
+    async def handle_client(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    response = await self.handle_request(line)
+                    writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                    await writer.drain()
+        except (ConnectionError, ValueError):
+            # Dropped connections and lines over the stream limit end this client only
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def handle_request(self, line):
+        received = time.perf_counter()
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            if request.get("op") == "stats":
+                return {"ok": True, "stats": self.stats.snapshot()}
+            rows = [self.submission_row(item) for item in request.get("submissions", [request])]
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future, received))
+        error = await future
+        response = {"ok": error is None, "rows": len(rows),
+                    "latency_ms": round((time.perf_counter() - received) * 1000, 3)}
+        if "id" in request:
+            response["id"] = request["id"]
+        if error:
+            response["error"] = error
+        return response
+
+    def submission_row(self, item):
+        if not isinstance(item, dict):
+            raise ValueError("Each submission must be a JSON object")
+        missing = [column for column in PRESENCE_COLUMNS if column not in item]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+        if item["status"] not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        if not all(item[column] for column in ("date", "lesson", "student_id")):
+            raise ValueError("date, lesson and student_id must not be empty")
+        return tuple(None if item[column] is None else str(item[column]) for column in PRESENCE_COLUMNS)
+
+    async def write_loop(self):
+        # Group commit: everything that queued up during the previous commit goes into the next one
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            row_count = len(batch[0][0])
+            while row_count < self.max_batch_rows and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                row_count += len(batch[-1][0])
+            rows = [row for item in batch for row in item[0]]
+            try:
+                saved = await loop.run_in_executor(self.executor, self.db_manager.save_submissions, rows)
+                error = None if saved else "Failed to save submissions"
+            except DatabaseError as e:
+                error = str(e)
+            committed = time.perf_counter()
+            self.stats.add_commit(len(rows), [(committed - received) * 1000 for _, _, received in batch])
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_result(error)
+                self.queue.task_done()
\ No newline at end of file
@@ -0,0 +1 @@
+# Subpackage initialization for utils
\ No newline at end of file
@@ -0,0 +1,128 @@
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Distinct statements kept per call; executemany can trace thousands of identical ones
+MAX_LOGGED_STATEMENTS = 20
+MAX_STATEMENT_LENGTH = 500
+
+
+class StatementTrace:
+    # SQL run during one timed call: a count of every statement, but only the first distinct ones are
+    # kept, so an executemany over 100k rows costs a counter increment per row rather than a string
+    def __init__(self):
+        self.count = 0
+        self.distinct = {}
+
+    def add(self, statement):
+        self.count += 1
+        if len(self.distinct) < MAX_LOGGED_STATEMENTS:
+            self.distinct.setdefault(" ".join(statement.split())[:MAX_STATEMENT_LENGTH])
+
+    def merge(self, other):
+        self.count += other.count
+        for statement in other.distinct:
+            if len(self.distinct) >= MAX_LOGGED_STATEMENTS:
+                break
+            self.distinct.setdefault(statement)
+
+
+class Instrumentation:
+    def __init__(self):
+        # Off unless enabled in config.json, so normal runs only pay for one attribute check per call
+        self.enabled = False
+        self.slow_threshold_ms = 500
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.logger = logging.getLogger("absence.instrumentation")
+        self.logger.propagate = False
+        self.handler = None
+
+    def configure(self, enabled, log_path=None, slow_threshold_ms=500, max_bytes=1024 * 1024, backup_count=3):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        if self.handler:
+            self.logger.removeHandler(self.handler)
+            self.handler.close()
+            self.handler = None
+        if enabled and log_path:
+            self.handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                               encoding="utf-8")
+            self.handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            self.logger.addHandler(self.handler)
+            self.logger.setLevel(logging.INFO)
+
+    def trace_sql(self, statement):
+        # sqlite3 trace callback; statements go to the innermost timed call on this thread
+        stack = getattr(self.local, "stack", None)
+        if stack:
+            stack[-1].add(statement)
+
+    def record(self, kind, operation, seconds, rows=None, statements=None):
+        # statements is the StatementTrace of a timed call
+        if not self.enabled:
+            return
+        elapsed_ms = seconds * 1000
+        slow = elapsed_ms >= self.slow_threshold_ms
+        with self.lock:
+            self.samples.setdefault((kind, operation), deque(maxlen=1000)).append((elapsed_ms, slow))
+        if not self.handler:
+            return
+        entry = {"kind": kind, "operation": operation, "ms": round(elapsed_ms, 3), "rows": rows,
+                 "statements": statements.count if statements else 0,
+                 "sql": list(statements.distinct) if statements else []}
+        self.logger.log(logging.WARNING if slow else logging.INFO, json.dumps(entry, ensure_ascii=False))
+
+    def stats(self):
+        # [(kind, operation, count, p50 ms, p95 ms, max ms, slow count)] sorted by slowest p95
+        with self.lock:
+            samples = {key: list(values) for key, values in self.samples.items()}
+        rows = []
+        for (kind, operation), values in samples.items():
+            timings = sorted(elapsed_ms for elapsed_ms, _ in values)
+            rows.append((kind, operation, len(timings), timings[int((len(timings) - 1) * 0.5)],
+                         timings[int((len(timings) - 1) * 0.95)], timings[-1], sum(slow for _, slow in values)))
+        return sorted(rows, key=lambda row: row[4], reverse=True)
+
+    def timed(self, func=None, rows=None):
+        # Decorator for DatabaseManager methods: wall time, row count and the SQL they ran.
+        # rows(instance, result) overrides the default count of the returned rows.
+        if func is None:
+            return functools.partial(self.timed, rows=rows)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            stack = self.local.__dict__.setdefault("stack", [])
+            stack.append(StatementTrace())
+            started = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                seconds = time.perf_counter() - started
+                statements = stack.pop()
+                if stack:
+                    stack[-1].merge(statements)
+                count = rows(args[0], result) if rows else self.row_count(result)
+                self.record("database", func.__name__, seconds, count, statements)
+        return wrapper
+
+    def row_count(self, result):
+        if isinstance(result, bool):
+            return None
+        if isinstance(result, int):
+            return result
+        if isinstance(result, (list, tuple, dict, set)):
+            return len(result)
+        return None
+
+
+INSTRUMENTATION = Instrumentation()
\ No newline at end of file
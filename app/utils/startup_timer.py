@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+
+class StartupTimer:
+    def __init__(self, enabled=None):
+        # Set ABSENCE_STARTUP_TIMING=1 to log how long each startup phase takes
+        self.enabled = os.environ.get("ABSENCE_STARTUP_TIMING") == "1" if enabled is None else enabled
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self, stream=None):
+        if not self.enabled:
+            return
+        stream = stream or sys.stderr
+        for phase, seconds in self.phases:
+            stream.write(f"[startup] {phase:<28} {seconds * 1000:8.1f} ms\n")
+        stream.write(f"[startup] {'total':<28} {(self.last - self.started) * 1000:8.1f} ms\n")
+        stream.flush()
+
+
+STARTUP_TIMER = StartupTimer()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.database.db_manager import DatabaseManager
+from app.database.export_manager import ExportManager
+
+
+def fill_database(db_manager, rows, students=500):
+    batch = []
+    for i in range(rows):
+        session = i // students
+        batch.append((f"2025-{session // 28 % 12 + 1:02d}-{session % 28 + 1:02d}", f"Lesson {session % 40}",
+                      "月曜日", "1-2", f"NUS:{i % students:09d}", "Present" if i % 7 else "Absent"))
+        if len(batch) == 50000:
+            db_manager.save_submissions(batch)
+            batch = []
+    if batch:
+        db_manager.save_submissions(batch)
+
+
+def legacy_export(db_manager, file_path):
+    import pandas as pd
+
+    records = db_manager.fetch_submissions_for_export()
+    df = pd.DataFrame(records, columns=["Date", "Lesson", "Day", "Period", "Student ID", "Status"])
+    df.to_excel(file_path, index=False)
+    return len(records)
+
+
+def measure(label, func, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {count:>9} rows {elapsed:8.2f} s {rows / elapsed:>10.0f} rows/s "
+          f"peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy and streaming export paths.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_manager = DatabaseManager(os.path.join(work_dir, "bench.db"))
+        fill_database(db_manager, args.rows)
+        exporter = ExportManager(db_manager)
+
+        if not args.skip_legacy:
+            measure("legacy pandas xlsx", lambda: legacy_export(db_manager, os.path.join(work_dir, "legacy.xlsx")),
+                    args.rows)
+        for extension in (".xlsx", ".csv", ".parquet"):
+            try:
+                measure(f"streaming {extension}",
+                        lambda: exporter.export(os.path.join(work_dir, f"stream{extension}")), args.rows)
+            except RuntimeError as e:
+                print(f"streaming {extension:<14} skipped: {e}")
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
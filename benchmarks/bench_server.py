@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.database.db_manager import DatabaseManager, raise_database_error
+from app.server.submission_server import SubmissionServer
+
+
+async def run_client(port, client, requests, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for request in range(requests):
+        submission = {"id": request, "date": f"2025-04-{request % 28 + 1:02d}", "lesson": f"Lesson {client % 10}",
+                      "day": "月曜日", "period": "1-2", "student_id": f"NUS:{client:09d}",
+                      "status": "Present" if request % 5 else "Absent"}
+        started = time.perf_counter()
+        writer.write(json.dumps(submission).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not response["ok"]:
+            errors.append(response.get("error"))
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_benchmark(db_manager, clients, requests):
+    server = SubmissionServer(db_manager, port=0)
+    port = await server.start()
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(port, client, requests, latencies, errors) for client in range(clients)))
+    elapsed = time.perf_counter() - started
+    stats = server.stats.snapshot()
+    await server.stop()
+    latencies.sort()
+    print(f"{clients} clients x {requests} requests in {elapsed:.2f} s "
+          f"({clients * requests / elapsed:.0f} req/s), {len(errors)} errors")
+    print(f"client latency p50 {latencies[len(latencies) // 2]:.1f} ms "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.1f} ms max {latencies[-1]:.1f} ms")
+    print(f"server {stats['commits']} commits, {stats['rows_per_commit']} rows per commit, "
+          f"p50 {stats['p50_ms']} ms p95 {stats['p95_ms']} ms")
+    if errors:
+        print(f"first error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the submission server with concurrent clients.")
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_manager = DatabaseManager(os.path.join(work_dir, "bench.db"), error_handler=raise_database_error)
+        asyncio.run(run_benchmark(db_manager, args.clients, args.requests))
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
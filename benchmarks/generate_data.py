@@ -0,0 +1,94 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.database.db_manager import DatabaseManager, raise_database_error, LESSON_UPSERT
+
+DAYS = ["月曜日", "火曜日", "水曜日", "木曜日", "金曜日"]
+PERIODS = ["1-2", "3-4", "5-6", "7-8", "9-10"]
+TERM_START = datetime.date(2025, 4, 7)
+
+
+def generate_rows(students, lessons, sessions, seed=0):
+    # Returns (lesson rows, student ids, submission rows) for a term of weekly lessons
+    rng = random.Random(seed)
+    student_ids = [f"NUS:{rng.randint(1, 9):02d}25{index:05d}" for index in range(students)]
+    # Most students attend reliably, a few rarely show up
+    attendance = {student_id: min(0.99, rng.betavariate(8, 1.5)) for student_id in student_ids}
+    class_size = min(students, max(20, students // 4))
+
+    lesson_rows, submissions = [], []
+    for index in range(lessons):
+        weekday = index % len(DAYS)
+        begin_date = TERM_START + datetime.timedelta(days=weekday)
+        end_date = begin_date + datetime.timedelta(weeks=sessions - 1)
+        lesson = (f"Lesson {index:03d}", DAYS[weekday], PERIODS[index // len(DAYS) % len(PERIODS)],
+                  begin_date.isoformat(), end_date.isoformat())
+        lesson_rows.append(lesson)
+        enrolled = rng.sample(student_ids, class_size)
+        for week in range(sessions):
+            date = (begin_date + datetime.timedelta(weeks=week)).isoformat()
+            for student_id in enrolled:
+                status = "Present" if rng.random() < attendance[student_id] else "Absent"
+                submissions.append((date, lesson[0], lesson[1], lesson[2], student_id, status))
+    return lesson_rows, student_ids, submissions
+
+
+def write_excel(file_path, headers, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(file_path)
+
+
+def write_database(file_path, lesson_rows, student_ids, submissions):
+    db_manager = DatabaseManager(file_path, error_handler=raise_database_error)
+    with db_manager.get_connection() as conn:
+        conn.executemany(LESSON_UPSERT, lesson_rows)
+    db_manager.add_students(student_ids)
+    db_manager.save_submissions(submissions)
+    db_manager.close()
+
+
+def generate_dataset(out_dir, students, lessons, sessions, seed=0):
+    # Writes source.db plus one .xlsx per import type; returns their paths and the generated rows
+    os.makedirs(out_dir, exist_ok=True)
+    lesson_rows, student_ids, submissions = generate_rows(students, lessons, sessions, seed)
+    paths = {"db": os.path.join(out_dir, "source.db"),
+             "lesson_xlsx": os.path.join(out_dir, "lessons.xlsx"),
+             "student_xlsx": os.path.join(out_dir, "students.xlsx"),
+             "presence_xlsx": os.path.join(out_dir, "presence.xlsx")}
+    if os.path.exists(paths["db"]):
+        os.remove(paths["db"])
+    write_database(paths["db"], lesson_rows, student_ids, submissions)
+    write_excel(paths["lesson_xlsx"], ["name", "day", "period", "begin_date", "end_date"], lesson_rows)
+    write_excel(paths["student_xlsx"], ["student_id"], [(student_id,) for student_id in student_ids])
+    write_excel(paths["presence_xlsx"], ["date", "lesson", "day", "period", "student_id", "status"], submissions)
+    return {"paths": paths, "lessons": lesson_rows, "students": student_ids, "submissions": submissions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic attendance dataset as .db and .xlsx files.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--lessons", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=15, help="sessions per lesson (one per week)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    dataset = generate_dataset(args.out_dir, args.students, args.lessons, args.sessions, args.seed)
+    print(f"{len(dataset['students'])} students, {len(dataset['lessons'])} lessons, "
+          f"{len(dataset['submissions'])} submissions")
+    for path in dataset["paths"].values():
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,179 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.database.db_manager import DatabaseManager, raise_database_error
+from app.database.export_manager import ExportManager
+from generate_data import generate_dataset
+
+# (students, lessons, sessions per lesson); submissions = lessons x sessions x class size
+SIZES = {
+    "small": (200, 10, 15),
+    "medium": (1000, 40, 15),
+    "large": (4000, 120, 30)
+}
+
+
+def measure(func, repeat, trace_memory):
+    # func returns the number of rows handled. Timing uses the best of repeat untraced runs,
+    # since tracemalloc slows allocation-heavy code; peak memory comes from one extra traced run.
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = func()
+        timings.append(time.perf_counter() - started)
+    seconds = min(timings)
+    result = {"rows": rows, "seconds": round(seconds, 4), "rows_per_sec": round(rows / max(seconds, 1e-9))}
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func()
+            result["peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def fresh_database(work_dir, name):
+    # Every run starts from an empty file so repeated runs do the same work
+    db_path = os.path.join(work_dir, f"{name}.db")
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    return DatabaseManager(db_path, error_handler=raise_database_error)
+
+
+def check(success):
+    if not success:
+        raise RuntimeError("operation reported failure")
+
+
+def run_size(size, work_dir, seed, repeat, trace_memory):
+    students, lessons, sessions = SIZES[size]
+    dataset = generate_dataset(os.path.join(work_dir, "data"), students, lessons, sessions, seed)
+    paths, submissions = dataset["paths"], dataset["submissions"]
+    results = {"dataset": {"students": students, "lessons": lessons, "sessions_per_lesson": sessions,
+                           "submissions": len(submissions)}}
+
+    def save_submissions():
+        # One final submission per session, as the submission window saves them
+        db_manager = fresh_database(work_dir, "save")
+        session_rows = {}
+        for row in submissions:
+            session_rows.setdefault(row[:4], []).append(row)
+        for rows in session_rows.values():
+            check(db_manager.save_submissions(rows))
+        db_manager.close()
+        return len(submissions)
+
+    def import_from(name, import_type, path, is_db):
+        def run():
+            db_manager = fresh_database(work_dir, name)
+            if import_type == "student":
+                check(db_manager.import_student_info(path, is_db, []))
+            else:
+                check(getattr(db_manager, f"import_{import_type}_info")(path, is_db))
+            rows = db_manager.last_import_stats["rows"]
+            db_manager.close()
+            return rows
+        return run
+
+    source = DatabaseManager(paths["db"], error_handler=raise_database_error)
+
+    def view_records():
+        # What the records window does on open: the total, then every page of the session summary
+        total = source.count_sessions()
+        fetched = 0
+        while fetched < total:
+            fetched += len(source.fetch_session_summary(200, fetched))
+        return fetched
+
+    operations = {
+        "save_submissions": save_submissions,
+        "fetch_records": lambda: len(source.fetch_records()),
+        "view_records": view_records,
+        # One student's history for one term, which should read only that student's rows
+        "fetch_records_student_term": lambda: len(source.fetch_records(
+            student_id=dataset["students"][0], start_date="2025-04-01", end_date="2025-09-30")),
+        "import_lesson_info_xlsx": import_from("lesson_xlsx", "lesson", paths["lesson_xlsx"], False),
+        "import_student_info_xlsx": import_from("student_xlsx", "student", paths["student_xlsx"], False),
+        "import_presence_info_xlsx": import_from("presence_xlsx", "presence", paths["presence_xlsx"], False),
+        "import_lesson_info_db": import_from("lesson_db", "lesson", paths["db"], True),
+        "import_student_info_db": import_from("student_db", "student", paths["db"], True),
+        "import_presence_info_db": import_from("presence_db", "presence", paths["db"], True),
+        "export_xlsx": lambda: ExportManager(source).export(os.path.join(work_dir, "export.xlsx"))
+    }
+    for name, func in operations.items():
+        result = results[name] = measure(func, repeat, trace_memory)
+        peak = f" peak {result['peak_mib']:>8.1f} MiB" if trace_memory else ""
+        print(f"{size:<7} {name:<28} {result['rows']:>9} rows {result['seconds']:>9.3f} s "
+              f"{result['rows_per_sec']:>10} rows/s{peak}", flush=True)
+    source.close()
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    # Prints the time ratio per operation; returns the operations slower than the baseline by more than
+    # tolerance, ignoring differences under min_delta seconds that are within timer noise
+    regressions = []
+    for size, operations in results["sizes"].items():
+        for name, current in operations.items():
+            previous = baseline.get("sizes", {}).get(size, {}).get(name)
+            if name == "dataset" or not previous:
+                continue
+            ratio = current["seconds"] / max(previous["seconds"], 1e-9)
+            flag = ""
+            if ratio > 1 + tolerance and current["seconds"] - previous["seconds"] > min_delta:
+                regressions.append(f"{size}/{name}")
+                flag = "  REGRESSION"
+            print(f"{size:<7} {name:<28} {previous['seconds']:>9.3f} s -> {current['seconds']:>9.3f} s "
+                  f"x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the main database operations on generated datasets.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per operation; the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--label", default="", help="stored with the results, e.g. a version or commit")
+    parser.add_argument("--output", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging, 0.2 = 20%%")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="seconds of slowdown always tolerated")
+    args = parser.parse_args()
+
+    # Imported up front so the first Excel import is not charged for loading pandas
+    import pandas
+
+    results = {"label": args.label, "created": datetime.datetime.now().isoformat(timespec="seconds"),
+               "python": platform.python_version(), "sqlite": sqlite3.sqlite_version, "platform": platform.platform(),
+               "sizes": {}}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results["sizes"][size] = run_size(size, work_dir, args.seed, args.repeat, not args.no_memory)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare} ({baseline.get('label') or baseline.get('created')})")
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,13 +1,20 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from app.utils.startup_timer import STARTUP_TIMER
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+STARTUP_TIMER.mark("import Qt")
 from app.gui.main_window import AbsenceWindow
+STARTUP_TIMER.mark("import main window")
 
 def main():
     app = QApplication(sys.argv)
+    STARTUP_TIMER.mark("create application")
     window = AbsenceWindow()
     window.show()
+    STARTUP_TIMER.mark("show main window")
+    QTimer.singleShot(0, lambda: (STARTUP_TIMER.mark("first event loop pass"), STARTUP_TIMER.report()))
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from app.database.archive_manager import ArchiveManager
+from app.database.calendar_manager import CalendarManager
+from app.database.db_manager import DatabaseManager, raise_database_error
+
+
+class ArchiveReadTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+        # "Old" ended in the 2025-1 term and is archived; "Open" runs across the boundary and stays live
+        self.db_manager.save_submissions([
+            ("2025-05-12", "Old", "月曜日", "1-2", "s1", "Present"),
+            ("2025-05-12", "Old", "月曜日", "1-2", "s2", "Absent"),
+            ("2025-05-13", "Open", "火曜日", "3-4", "s1", "Absent"),
+            ("2025-11-04", "Open", "火曜日", "3-4", "s1", "Present")
+        ])
+        with self.db_manager.get_connection() as conn:
+            conn.execute("UPDATE lessons SET begin_date = '2025-04-07', end_date = '2025-07-28' WHERE name = 'Old'")
+            conn.execute("UPDATE lessons SET begin_date = '2025-04-08', end_date = '2026-01-27' WHERE name = 'Open'")
+        self.moved = ArchiveManager(self.db_manager).archive_closed_terms("2025-12-01")
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def test_archive_moves_closed_lessons_only(self):
+        self.assertEqual(self.moved, {"2025-1": 2})
+        self.assertEqual(self.db_manager.count_records(), 2)
+
+    def test_date_range_reads_archived_terms(self):
+        rows = self.db_manager.fetch_records(start_date="2025-04-01", end_date="2025-12-31")
+        self.assertEqual(rows, [
+            ("2025-05-12", "Old", "月曜日", "1-2", "s1", "Present"),
+            ("2025-05-12", "Old", "月曜日", "1-2", "s2", "Absent"),
+            ("2025-05-13", "Open", "火曜日", "3-4", "s1", "Absent"),
+            ("2025-11-04", "Open", "火曜日", "3-4", "s1", "Present")
+        ])
+        self.assertEqual(self.db_manager.count_records(start_date="2025-04-01", end_date="2025-12-31"), 4)
+
+    def test_filters_and_paging_across_the_boundary(self):
+        filters = {"student_id": "s1", "start_date": "2025-05-01"}
+        self.assertEqual(self.db_manager.count_records(**filters), 3)
+        pages = [self.db_manager.fetch_records(limit=2, offset=offset, **filters) for offset in (0, 2)]
+        self.assertEqual([row[1] for page in pages for row in page], ["Old", "Open", "Open"])
+        self.assertEqual(self.db_manager.fetch_records(status="Absent", lesson_name="Old", end_date="2025-06-30"),
+                         [("2025-05-12", "Old", "月曜日", "1-2", "s2", "Absent")])
+
+    def test_export_chunks_include_archived_rows(self):
+        chunks = self.db_manager.iter_submission_chunks(1, start_date="2025-01-01")
+        self.assertEqual(sum(len(rows) for rows in chunks), 4)
+        # The archive is detached again afterwards
+        schemas = [row[1] for row in self.db_manager.get_connection().execute('PRAGMA database_list')]
+        self.assertNotIn("archive", schemas)
+
+    def test_range_outside_archives_reads_live_only(self):
+        self.assertEqual(self.db_manager.count_records(start_date="2025-10-01"), 1)
+
+    def test_missing_sessions_skip_archived_lessons_only(self):
+        calendar = CalendarManager(self.db_manager)
+        missing = calendar.missing_sessions(start_date="2025-04-01", before_date="2025-12-01")
+        self.assertNotIn("Old", {lesson for _, lesson, _ in missing})
+        # The open lesson's gaps before the archived lesson's last session are still reported
+        dates = [date for date, lesson, _ in missing if lesson == "Open"]
+        self.assertEqual(dates[0], "2025-04-08")
+        self.assertNotIn("2025-05-13", dates)
+        self.assertNotIn("2025-11-04", dates)
+        self.assertEqual(calendar.missing_sessions(before_date="2025-12-01"), missing)
+
+
+class RepeatedArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+        self.archive_manager = ArchiveManager(self.db_manager)
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def save_closed_lesson(self, row, end_date):
+        self.db_manager.save_submissions([row])
+        with self.db_manager.get_connection() as conn:
+            conn.execute("UPDATE lessons SET begin_date = '2025-04-01', end_date = ? WHERE name = ?",
+                         (end_date, row[1]))
+        cursor = self.db_manager.get_connection().execute(
+            "SELECT se.id FROM sessions se JOIN lessons l ON l.id = se.lesson_id WHERE l.name = ?", (row[1],))
+        return cursor.fetchone()[0]
+
+    def test_second_run_into_the_same_term_keeps_its_sessions(self):
+        first_session = self.save_closed_lesson(("2025-05-12", "A", "月曜日", "1-2", "s1", "Present"), "2025-07-28")
+        self.assertEqual(self.archive_manager.archive_closed_terms("2025-12-01"), {"2025-1": 1})
+        # With A's session gone, the live database hands its id to B's session
+        second_session = self.save_closed_lesson(("2025-08-05", "B", "火曜日", "3-4", "s1", "Absent"), "2025-08-26")
+        self.assertEqual(second_session, first_session)
+        self.assertEqual(self.archive_manager.archive_closed_terms("2025-12-01"), {"2025-1": 1})
+        self.assertEqual(self.db_manager.fetch_records(start_date="2025-04-01"), [
+            ("2025-05-12", "A", "月曜日", "1-2", "s1", "Present"),
+            ("2025-08-05", "B", "火曜日", "3-4", "s1", "Absent")
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
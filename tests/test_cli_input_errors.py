@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+from app.cli import main, EXIT_BAD_INPUT, EXIT_FAILED
+from app.database.archive_manager import ArchiveManager
+from app.database.db_manager import DatabaseManager, raise_database_error
+
+
+class CliInputErrorTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exit_code = main(["--db", os.path.join(self.temp_dir.name, "records.db"),
+                              "--config", os.path.join(self.temp_dir.name, "config.json"), *args])
+        return exit_code, json.loads(output.getvalue())
+
+    def run_import(self, file_name, content):
+        file_path = os.path.join(self.temp_dir.name, file_name)
+        with open(file_path, "wb") as f:
+            f.write(content)
+        return self.run_cli("import", "presence", file_path)
+
+    def assert_bad_input(self, file_name, content):
+        exit_code, result = self.run_import(file_name, content)
+        self.assertEqual(exit_code, EXIT_BAD_INPUT)
+        self.assertFalse(result["ok"])
+        self.assertIn(file_name, result["error"])
+
+    def test_corrupt_workbook(self):
+        self.assert_bad_input("corrupt.xlsx", b"not a zip archive")
+
+    def test_zip_that_is_not_a_workbook(self):
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, "w") as archive:
+            archive.writestr("notes.txt", "hello")
+        self.assert_bad_input("notes.xlsx", content.getvalue())
+
+    def test_malformed_csv(self):
+        self.assert_bad_input("huge.csv", b"date,lesson,day,period,student_id,status\n" + b"x" * 200000 + b"\n")
+
+    def test_database_without_the_source_columns(self):
+        file_path = os.path.join(self.temp_dir.name, "other.db")
+        with sqlite3.connect(file_path) as conn:
+            conn.execute("CREATE TABLE submissions (note TEXT)")
+        conn.close()
+        exit_code, result = self.run_cli("import", "presence", file_path)
+        self.assertEqual(exit_code, EXIT_BAD_INPUT)
+        self.assertIn("Source table submissions is missing columns", result["error"])
+
+    def test_file_that_is_not_a_database(self):
+        self.assert_bad_input("notes.db", b"plain text, not SQLite " * 100)
+
+    def test_missing_archive_file_is_reported_as_json(self):
+        db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"), error_handler=raise_database_error)
+        db_manager.save_submissions([("2025-05-12", "Old", "月曜日", "1-2", "s1", "Present")])
+        with db_manager.get_connection() as conn:
+            conn.execute("UPDATE lessons SET end_date = '2025-07-28'")
+        archive_manager = ArchiveManager(db_manager)
+        archive_manager.archive_closed_terms("2025-12-01")
+        db_manager.close()
+        os.remove(os.path.join(archive_manager.archive_dir, "term_2025-1.db"))
+        exit_code, result = self.run_cli("export", os.path.join(self.temp_dir.name, "out.csv"), "--from", "2025-01-01")
+        self.assertEqual(exit_code, EXIT_FAILED)
+        self.assertIn("term_2025-1.db", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
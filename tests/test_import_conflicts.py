@@ -0,0 +1,85 @@
+import csv
+import datetime
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.database.db_manager import DatabaseManager, raise_database_error
+
+
+class NewestConflictTest(unittest.TestCase):
+    HEADER = ["date", "lesson", "day", "period", "student_id", "status", "submitted_at"]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def write_csv(self, name, rows, header=HEADER):
+        file_path = os.path.join(self.temp_dir.name, name)
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return file_path
+
+    def statuses(self):
+        return [(row[4], row[5]) for row in self.db_manager.fetch_records()]
+
+    def import_csv(self, name, status, submitted_at):
+        file_path = self.write_csv(name, [("2025-04-07", "Math", "月曜日", "1-2", "s1", status, submitted_at)])
+        self.db_manager.import_file_streaming(file_path, "presence", conflict="newest")
+
+    def test_newer_csv_row_replaces_older_one(self):
+        self.import_csv("first.csv", "Absent", "2025-04-07 09:00:00")
+        self.import_csv("newer.csv", "Present", "2025-04-07T09:30:00")
+        self.assertEqual(self.statuses(), [("s1", "Present")])
+        self.import_csv("older.csv", "Absent", "2025-04-07 08:00:00")
+        self.assertEqual(self.statuses(), [("s1", "Present")])
+
+    def test_newer_excel_row_replaces_older_one(self):
+        import pandas as pd
+
+        self.import_csv("first.csv", "Absent", "2025-04-07 09:00:00")
+        file_path = os.path.join(self.temp_dir.name, "newer.xlsx")
+        pd.DataFrame([(datetime.datetime(2025, 4, 7), "Math", "月曜日", "1-2", "s1", "Present",
+                       datetime.datetime(2025, 4, 7, 9, 30))], columns=self.HEADER[:-1] + ["timestamp"]).to_excel(
+            file_path, index=False)
+        self.assertTrue(self.db_manager.import_presence_info(file_path, False, conflict="newest"))
+        self.assertEqual(self.statuses(), [("s1", "Present")])
+
+    def test_newest_needs_a_timestamp_column(self):
+        file_path = self.write_csv("plain.csv", [("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present")],
+                                   self.HEADER[:-1])
+        with self.assertRaises(ValueError):
+            self.db_manager.import_file_streaming(file_path, "presence", conflict="newest")
+        self.db_manager.import_file_streaming(file_path, "presence", conflict="skip")
+        self.assertEqual(self.statuses(), [("s1", "Present")])
+
+    def test_newer_database_row_replaces_older_one(self):
+        self.import_csv("first.csv", "Absent", "2025-04-07 09:00:00")
+        source = DatabaseManager(os.path.join(self.temp_dir.name, "source.db"), error_handler=raise_database_error)
+        source.save_submissions([("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present")])
+        source.close()
+        self.assertTrue(self.db_manager.import_presence_info(source.db_path, True, conflict="newest"))
+        self.assertEqual(self.statuses(), [("s1", "Present")])
+
+    def test_newest_needs_a_database_with_timestamps(self):
+        file_path = os.path.join(self.temp_dir.name, "legacy.db")
+        with sqlite3.connect(file_path) as conn:
+            conn.execute(f"CREATE TABLE submissions (id INTEGER PRIMARY KEY, {', '.join(self.HEADER[:-1])})")
+            conn.execute("INSERT INTO submissions (date, lesson, day, period, student_id, status) "
+                         "VALUES ('2025-04-07', 'Math', '月曜日', '1-2', 's1', 'Present')")
+        conn.close()
+        with self.assertRaises(ValueError):
+            self.db_manager.import_presence_info(file_path, True, conflict="newest")
+        self.assertTrue(self.db_manager.import_presence_info(file_path, True, conflict="skip"))
+        self.assertEqual(self.statuses(), [("s1", "Present")])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import csv
+import os
+import tempfile
+import unittest
+from app.database.db_manager import DatabaseManager, raise_database_error
+from app.database.export_manager import ExportManager
+
+
+class IncrementalExportTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+        self.db_manager.save_submissions([("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present")])
+        self.exporter = ExportManager(self.db_manager)
+        self.file_path = os.path.join(self.temp_dir.name, "records.csv")
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def read_rows(self):
+        with open(self.file_path, newline="", encoding="utf-8-sig") as f:
+            return list(csv.reader(f))[1:]
+
+    def test_existing_file_without_watermark_needs_confirmation(self):
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write("kept\n")
+        self.assertTrue(self.exporter.replaces_existing_file(self.file_path))
+        with self.assertRaises(FileExistsError):
+            self.exporter.export_incremental(self.file_path)
+        with open(self.file_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "kept\n")
+        self.assertEqual(self.exporter.export_incremental(self.file_path, overwrite=True), (self.file_path, 1))
+        self.assertFalse(self.exporter.replaces_existing_file(self.file_path))
+
+    def test_later_runs_append_new_rows_only(self):
+        self.exporter.export_incremental(self.file_path)
+        self.db_manager.save_submissions([("2025-04-14", "Math", "月曜日", "1-2", "s1", "Absent")])
+        self.assertEqual(self.exporter.export_incremental(self.file_path), (self.file_path, 1))
+        self.assertEqual([row[0] for row in self.read_rows()], ["2025-04-07", "2025-04-14"])
+        self.assertEqual(self.exporter.export_incremental(self.file_path), (None, 0))
+        self.assertEqual(os.listdir(self.temp_dir.name).count("records.partial.csv"), 0)
+
+    def test_corrected_submission_is_exported_again(self):
+        self.exporter.export_incremental(self.file_path)
+        self.db_manager.save_submissions([("2025-04-07", "Math", "月曜日", "1-2", "s1", "Absent")])
+        self.assertEqual(self.exporter.export_incremental(self.file_path), (self.file_path, 1))
+        self.assertEqual([row[5] for row in self.read_rows()], ["Present", "Absent"])
+        # A file written from scratch holds only the corrected row
+        full_path = os.path.join(self.temp_dir.name, "full.csv")
+        self.assertEqual(self.exporter.export_incremental(full_path), (full_path, 1))
+
+    def test_import_that_changes_nothing_leaves_nothing_to_export(self):
+        self.exporter.export_incremental(self.file_path)
+        with self.db_manager.get_connection() as conn:
+            self.db_manager.insert_submission_rows(
+                conn.cursor(), [("2025-04-07", "Math", "月曜日", "1-2", "s1", "Absent")], conflict="skip")
+        self.assertEqual(self.exporter.export_incremental(self.file_path), (None, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,25 @@
+import unittest
+from app.utils.instrumentation import StatementTrace, MAX_LOGGED_STATEMENTS
+
+
+class StatementTraceTest(unittest.TestCase):
+    def test_counts_every_statement_but_keeps_only_the_first_distinct(self):
+        trace = StatementTrace()
+        for index in range(1000):
+            trace.add(f"INSERT INTO students (student_id)\n    VALUES ('s{index}')")
+        self.assertEqual(trace.count, 1000)
+        self.assertEqual(len(trace.distinct), MAX_LOGGED_STATEMENTS)
+        self.assertEqual(next(iter(trace.distinct)), "INSERT INTO students (student_id) VALUES ('s0')")
+
+    def test_merge_adds_counts_within_the_cap(self):
+        parent, child = StatementTrace(), StatementTrace()
+        parent.add("BEGIN")
+        child.add("BEGIN")
+        child.add("COMMIT")
+        parent.merge(child)
+        self.assertEqual(parent.count, 3)
+        self.assertEqual(list(parent.distinct), ["BEGIN", "COMMIT"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from PyQt6.QtCore import QDate
+from app.database.db_manager import DatabaseManager, raise_database_error
+
+
+def lesson(name, day="月曜日"):
+    return {"name": name, "day": day, "period": "1-2",
+            "begin_date": QDate(2025, 4, 7), "end_date": QDate(2025, 7, 28)}
+
+
+class LessonChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+        self.db_manager.update_lesson(None, lesson("Math"))
+        self.db_manager.update_lesson(None, lesson("Art"))
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def test_changes_are_relative_to_the_callers_revision(self):
+        revision, lessons, names = self.db_manager.lesson_changes_since(None)
+        self.assertEqual(sorted(names.values()), ["Art", "Math"])
+        self.db_manager.update_lesson("Math", lesson("Algebra", "火曜日"))
+        # Another reader loading lessons does not consume the change
+        self.assertIn("Algebra", self.db_manager.load_lessons())
+        current, changed, names = self.db_manager.lesson_changes_since(revision)
+        self.assertEqual([changed_lesson["name"] for changed_lesson in changed.values()], ["Algebra"])
+        self.assertEqual(sorted(names.values()), ["Algebra", "Art"])
+        self.assertEqual(self.db_manager.lesson_changes_since(current), (current, {}, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.database.db_manager import DatabaseManager, SCHEMA_VERSION, raise_database_error
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "records.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def open_database(self):
+        db_manager = DatabaseManager(self.db_path, error_handler=raise_database_error)
+        self.addCleanup(db_manager.close)
+        return db_manager
+
+    def create_file(self, statements, rows=()):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+            for statement, params in rows:
+                conn.execute(statement, params)
+        conn.close()
+
+    def test_baseline_layout_is_normalized(self):
+        # The original flat layout, with a later duplicate correcting s1's status
+        insert = "INSERT INTO submissions (date, lesson, day, period, student_id, status) VALUES (?, ?, ?, ?, ?, ?)"
+        self.create_file([
+            '''CREATE TABLE submissions (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT, lesson TEXT, day TEXT,
+                                         period TEXT, student_id TEXT, status TEXT)''',
+            '''CREATE TABLE lessons (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, day TEXT, period TEXT,
+                                     begin_date TEXT, end_date TEXT)''',
+            "INSERT INTO lessons (name, day, period, begin_date, end_date) "
+            "VALUES ('Math', '月曜日', '1-2', '2025-04-07', '2025-07-28')"
+        ], [
+            (insert, ("2025-04-07", "Math", "月曜日", "1-2", "s1", "Absent")),
+            (insert, ("2025-04-07", "Math", "月曜日", "1-2", "s2", "Present")),
+            (insert, ("2025-04-14", "Art", "火曜日", "3-4", "s1", "Present")),
+            (insert, ("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present"))
+        ])
+        db_manager = self.open_database()
+        self.assertEqual(db_manager.fetch_records(), [
+            ("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present"),
+            ("2025-04-07", "Math", "月曜日", "1-2", "s2", "Present"),
+            ("2025-04-14", "Art", "火曜日", "3-4", "s1", "Present")
+        ])
+        lesson = db_manager.load_lessons()["Math"]
+        self.assertEqual(lesson["end_date"].toString("yyyy-MM-dd"), "2025-07-28")
+        self.assertEqual(db_manager.check_summaries(), {"session_summary": 0, "student_lesson_summary": 0})
+        conn = db_manager.get_connection()
+        self.assertEqual(conn.execute('PRAGMA user_version').fetchone()[0], SCHEMA_VERSION)
+        self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'submissions_v1'").fetchone())
+
+    def test_v2_duplicates_are_compacted(self):
+        # v2 had no natural-key index, so the same student and session could be stored twice
+        self.create_file([
+            "CREATE TABLE students (id INTEGER PRIMARY KEY, student_id TEXT NOT NULL UNIQUE)",
+            '''CREATE TABLE lessons (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, day TEXT, period TEXT,
+                                     begin_date TEXT, end_date TEXT)''',
+            '''CREATE TABLE sessions (id INTEGER PRIMARY KEY, lesson_id INTEGER NOT NULL, date TEXT NOT NULL, day TEXT,
+                                      period TEXT NOT NULL, UNIQUE (lesson_id, date, period))''',
+            '''CREATE TABLE submissions (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id INTEGER NOT NULL,
+                                         student_ref INTEGER NOT NULL, status INTEGER NOT NULL)''',
+            "INSERT INTO students (id, student_id) VALUES (1, 's1'), (2, 's2')",
+            "INSERT INTO lessons (id, name, day, period) VALUES (1, 'Math', '月曜日', '1-2')",
+            "INSERT INTO sessions (id, lesson_id, date, day, period) VALUES (1, 1, '2025-04-07', '月曜日', '1-2')",
+            "INSERT INTO submissions (id, session_id, student_ref, status) VALUES (1, 1, 1, 0), (2, 1, 2, 1), (3, 1, 1, 1)",
+            "PRAGMA user_version = 2"
+        ])
+        db_manager = self.open_database()
+        self.assertEqual(db_manager.fetch_records(), [
+            ("2025-04-07", "Math", "月曜日", "1-2", "s2", "Present"),
+            ("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present")
+        ])
+        self.assertEqual(db_manager.check_summaries(), {"session_summary": 0, "student_lesson_summary": 0})
+        # Students known only from history stay out of the roster
+        self.assertEqual(db_manager.load_roster(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from app.database.db_manager import DatabaseManager, raise_database_error
+
+
+class CsvRosterImportTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def import_csv(self, content):
+        file_path = os.path.join(self.temp_dir.name, "roster.csv")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return self.db_manager.import_file_streaming(file_path, "student", batch_size=2)
+
+    def test_lesson_column_enrolls_students(self):
+        self.assertEqual(self.import_csv("student_id,lesson\ns1,Math\ns2,Math\ns3,Art\ns4,\n"), 4)
+        self.assertEqual(sorted(self.db_manager.load_roster()), ["s1", "s2", "s3", "s4"])
+        self.assertEqual(sorted(self.db_manager.load_enrollment("Math")), ["s1", "s2"])
+        self.assertEqual(self.db_manager.load_enrollment("Art"), ["s3"])
+
+    def test_roster_without_lessons(self):
+        self.import_csv("student_id\ns1\ns2\n")
+        self.assertEqual(sorted(self.db_manager.load_roster()), ["s1", "s2"])
+        self.assertNotIn("Math", self.db_manager.load_lessons())
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import csv
+import os
+import tempfile
+import unittest
+from app.database.archive_manager import ArchiveManager
+from app.database.db_manager import DatabaseManager, raise_database_error
+
+
+class SummaryTriggerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, "records.db"),
+                                          error_handler=raise_database_error)
+
+    def tearDown(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def assertConsistent(self):
+        self.assertEqual(self.db_manager.check_summaries(), {"session_summary": 0, "student_lesson_summary": 0})
+
+    def session_counts(self):
+        cursor = self.db_manager.get_connection().cursor()
+        cursor.execute('''
+            SELECT present_count, absent_count FROM session_summary
+            WHERE present_count <> 0 OR absent_count <> 0
+        ''')
+        return cursor.fetchall()
+
+    def test_insert_overwrite_and_delete_keep_summaries_consistent(self):
+        self.db_manager.save_submissions([
+            ("2025-04-07", "Math", "月曜日", "1-2", "s1", "Present"),
+            ("2025-04-07", "Math", "月曜日", "1-2", "s2", "Absent")
+        ])
+        self.assertConsistent()
+        self.assertEqual(self.session_counts(), [(1, 1)])
+
+        # A repeated submission and an overwriting import both correct the stored status
+        self.db_manager.save_submissions([("2025-04-07", "Math", "月曜日", "1-2", "s2", "Present")])
+        self.assertConsistent()
+        self.assertEqual(self.session_counts(), [(2, 0)])
+        file_path = os.path.join(self.temp_dir.name, "correction.csv")
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["date", "lesson", "day", "period", "student_id", "status"])
+            writer.writerow(["2025-04-07", "Math", "月曜日", "1-2", "s1", "Absent"])
+        self.db_manager.import_file_streaming(file_path, "presence", conflict="overwrite")
+        self.assertConsistent()
+        self.assertEqual(self.session_counts(), [(1, 1)])
+
+        with self.db_manager.get_connection() as conn:
+            conn.execute('''
+                DELETE FROM submissions
+                WHERE student_ref = (SELECT id FROM students WHERE student_id = 's1')
+            ''')
+        self.assertConsistent()
+        self.assertEqual(self.session_counts(), [(1, 0)])
+
+    def test_archiving_keeps_summaries_consistent(self):
+        self.db_manager.save_submissions([
+            ("2025-05-12", "Old", "月曜日", "1-2", "s1", "Present"),
+            ("2025-05-13", "Open", "火曜日", "3-4", "s1", "Absent")
+        ])
+        with self.db_manager.get_connection() as conn:
+            conn.execute("UPDATE lessons SET begin_date = '2025-04-07', end_date = '2025-07-28' WHERE name = 'Old'")
+            conn.execute("UPDATE lessons SET begin_date = '2025-04-08', end_date = '2026-01-27' WHERE name = 'Open'")
+        self.assertEqual(ArchiveManager(self.db_manager).archive_closed_terms("2025-12-01"), {"2025-1": 1})
+        self.assertConsistent()
+        self.assertEqual(self.session_counts(), [(0, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file